@@ -0,0 +1,49 @@
+"""Denormalized entry counters on bets and bet_options
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("bets", sa.Column("entries_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("bets", sa.Column("distinct_option_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("bet_options", sa.Column("entry_count", sa.Integer(), nullable=False, server_default="0"))
+
+    op.execute(
+        """
+        UPDATE bet_options AS o
+        SET entry_count = s.n
+        FROM (SELECT option_id, COUNT(*) AS n FROM bet_entries GROUP BY option_id) AS s
+        WHERE o.id = s.option_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE bets AS b
+        SET entries_count = s.n, distinct_option_count = s.d
+        FROM (
+            SELECT bet_id, COUNT(*) AS n, COUNT(DISTINCT option_id) AS d
+            FROM bet_entries
+            GROUP BY bet_id
+        ) AS s
+        WHERE b.id = s.bet_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("bet_options", "entry_count")
+    op.drop_column("bets", "distinct_option_count")
+    op.drop_column("bets", "entries_count")
@@ -0,0 +1,31 @@
+"""Composite (circle_id, created_at DESC, id DESC) index for keyset pagination of bets
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_bets_circle_id_created_at_id",
+        "bets",
+        ["circle_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    # The composite index has circle_id as its prefix, so the single-column one is redundant
+    op.drop_index("ix_bets_circle_id", table_name="bets")
+
+
+def downgrade() -> None:
+    op.create_index("ix_bets_circle_id", "bets", ["circle_id"])
+    op.drop_index("ix_bets_circle_id_created_at_id", table_name="bets")
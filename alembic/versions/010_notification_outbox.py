@@ -0,0 +1,49 @@
+"""Notification outbox table
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "notification_events",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("type", sa.String(32), nullable=False),
+        sa.Column("title", sa.String(300), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("bet_id", sa.Uuid(), nullable=True),
+        sa.Column("circle_id", sa.Uuid(), nullable=True),
+        sa.Column("actor_id", sa.Uuid(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("available_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["bet_id"], ["bets.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["circle_id"], ["circles.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["actor_id"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_notification_events_pending",
+        "notification_events",
+        ["available_at"],
+        postgresql_where=sa.text("processed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notification_events_pending", table_name="notification_events")
+    op.drop_table("notification_events")
@@ -0,0 +1,29 @@
+"""Add partial index on bets(end_time) for the expiry sweep
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_bets_pending_end_time",
+        "bets",
+        ["end_time"],
+        postgresql_where=sa.text("is_time_limited AND status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_bets_pending_end_time", table_name="bets")
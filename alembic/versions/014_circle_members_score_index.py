@@ -0,0 +1,28 @@
+"""Add (circle_id, score DESC, user_id) index for ranked leaderboards
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_circle_members_circle_id_score",
+        "circle_members",
+        ["circle_id", sa.text("score DESC"), "user_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_circle_members_circle_id_score", table_name="circle_members")
@@ -0,0 +1,53 @@
+"""Score ledger and daily score rollups
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "score_events",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("circle_id", sa.Uuid(), nullable=False),
+        sa.Column("bet_id", sa.Uuid(), nullable=False),
+        sa.Column("delta", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["circle_id"], ["circles.id"]),
+        sa.ForeignKeyConstraint(["bet_id"], ["bets.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_score_events_circle_id_user_id_created_at", "score_events", ["circle_id", "user_id", "created_at"]
+    )
+    op.create_index("ix_score_events_bet_id", "score_events", ["bet_id"])
+    op.create_table(
+        "daily_scores",
+        sa.Column("circle_id", sa.Uuid(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("delta", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["circle_id"], ["circles.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("circle_id", "day", "user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_scores")
+    op.drop_index("ix_score_events_bet_id", table_name="score_events")
+    op.drop_index("ix_score_events_circle_id_user_id_created_at", table_name="score_events")
+    op.drop_table("score_events")
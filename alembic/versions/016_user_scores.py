@@ -0,0 +1,54 @@
+"""Cross-circle user_scores aggregate for the global leaderboard
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_scores",
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("total_score", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("circles_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("bets_won", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("bets_lost", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_index("ix_user_scores_total_score", "user_scores", [sa.text("total_score DESC"), "user_id"])
+    op.execute(
+        """
+        INSERT INTO user_scores (user_id, total_score, circles_count, bets_won, bets_lost)
+        SELECT m.user_id, m.total_score, m.circles_count, COALESCE(o.won, 0), COALESCE(o.lost, 0)
+        FROM (
+            SELECT user_id, SUM(score) AS total_score, COUNT(*) AS circles_count
+            FROM circle_members GROUP BY user_id
+        ) m
+        LEFT JOIN (
+            SELECT e.user_id,
+                   COUNT(*) FILTER (WHERE e.option_id = b.result_option_id) AS won,
+                   COUNT(*) FILTER (WHERE e.option_id <> b.result_option_id) AS lost
+            FROM bet_entries e JOIN bets b ON b.id = e.bet_id
+            WHERE b.status = 'FINISHED' AND b.result_option_id IS NOT NULL
+            GROUP BY e.user_id
+        ) o ON o.user_id = m.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_scores_total_score", table_name="user_scores")
+    op.drop_table("user_scores")
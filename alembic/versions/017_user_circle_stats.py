@@ -0,0 +1,39 @@
+"""Per-member user_circle_stats, maintained by bet settlement
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "017"
+down_revision: Union[str, None] = "016"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled from history by scripts/backfill_user_circle_stats.py (streaks need per-member ordering)
+    op.create_table(
+        "user_circle_stats",
+        sa.Column("circle_id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("bets_won", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("bets_lost", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("current_streak", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("best_win_streak", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("double_downs", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("double_downs_won", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["circle_id"], ["circles.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("circle_id", "user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_circle_stats")
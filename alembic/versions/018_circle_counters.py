@@ -0,0 +1,33 @@
+"""Denormalized member_count and bet_count on circles
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "018"
+down_revision: Union[str, None] = "017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("circles", sa.Column("member_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("circles", sa.Column("bet_count", sa.Integer(), nullable=False, server_default="0"))
+    op.execute(
+        """
+        UPDATE circles c SET
+            member_count = (SELECT COUNT(*) FROM circle_members m WHERE m.circle_id = c.id),
+            bet_count = (SELECT COUNT(*) FROM bets b WHERE b.circle_id = c.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("circles", "bet_count")
+    op.drop_column("circles", "member_count")
@@ -0,0 +1,25 @@
+"""Index circle_members for keyset-paginated member listings
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "019"
+down_revision: Union[str, None] = "018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_circle_members_circle_id_joined_at", "circle_members", ["circle_id", "joined_at", "user_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_circle_members_circle_id_joined_at", table_name="circle_members")
@@ -0,0 +1,29 @@
+"""Index processed notification_events for the outbox pruner
+
+Revision ID: 020
+Revises: 019
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "020"
+down_revision: Union[str, None] = "019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_notification_events_processed_at",
+        "notification_events",
+        ["processed_at"],
+        postgresql_where=sa.text("processed_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notification_events_processed_at", table_name="notification_events")
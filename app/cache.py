@@ -0,0 +1,75 @@
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_registry: dict[str, "LRUCache[Any, Any]"] = {}
+
+
+class LRUCache(Generic[K, V]):
+    """Size-bounded in-process LRU cache with an optional TTL and hit/miss counters.
+
+    Caches are registered by name so their stats can be reported together.
+    Not thread-safe; it is meant to be used from the event loop only.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float | None = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[K, tuple[float | None, V]] = OrderedDict()
+        _registry[name] = self
+
+    def get(self, key: K) -> V | None:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def peek(self, key: K) -> V | None:
+        """The cached value, if any, without counting a lookup or refreshing its recency."""
+        item = self._data.get(key)
+        if item is None or (item[0] is not None and item[0] <= time.monotonic()):
+            return None
+        return item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def cache_stats() -> dict[str, dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _registry.items()}
@@ -6,6 +6,27 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change-me"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
     BET_EXPIRY_CHECK_INTERVAL_SECONDS: int = 60
+    BET_EXPIRY_BATCH_SIZE: int = 500
+    NOTIFICATION_OUTBOX_POLL_SECONDS: float = 1.0
+    NOTIFICATION_OUTBOX_BATCH_SIZE: int = 100
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_OUTBOX_RETENTION_HOURS: int = 24
+    NOTIFICATION_OUTBOX_PRUNE_SECONDS: int = 3600
+    NOTIFICATION_OUTBOX_PRUNE_BATCH_SIZE: int = 5000
+    BET_LIST_CACHE_SIZE: int = 1024
+    LEADERBOARD_CACHE_SIZE: int = 256
+    LEADERBOARD_CACHE_TTL_SECONDS: float | None = 30.0
+    LEADERBOARD_SLICES_PER_CIRCLE: int = 256
+    USER_SCORES_RECONCILE_SECONDS: int = 3600
+    JOB_LEADER_RETRY_SECONDS: float = 5.0
+    JOB_LEADER_HEARTBEAT_SECONDS: float = 10.0
+    MEMBERSHIP_CACHE_SIZE: int = 10000
+    MEMBERSHIP_CACHE_TTL_SECONDS: float = 300.0
+    MEMBERSHIP_NEGATIVE_CACHE_TTL_SECONDS: float = 5.0
+    MEMBER_STREAM_BATCH_SIZE: int = 500
+    INVITE_CACHE_SIZE: int = 4096
+    INVITE_NEGATIVE_CACHE_TTL_SECONDS: float = 60.0
+    DASHBOARD_PREVIEW_SIZE: int = 10
     GOOGLE_CLIENT_ID: str = ""
 
     AWS_ACCESS_KEY_ID: str = ""
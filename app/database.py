@@ -1,5 +1,6 @@
 from collections.abc import AsyncGenerator
 
+from sqlalchemy import Insert, Select, func, insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -16,3 +17,12 @@ class Base(DeclarativeBase):
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
+
+
+def insert_from_select(model: type[Base], names: list[str], rows: Select) -> Insert:
+    """INSERT ... SELECT of ``rows`` into the ``names`` columns of ``model``, with a fresh id per row.
+
+    The ids are generated in the database: the model's Python-side uuid4 default would be
+    evaluated once and give every inserted row the same id.
+    """
+    return insert(model).from_select([*names, "id"], rows.add_columns(func.gen_random_uuid()))
@@ -0,0 +1,86 @@
+import asyncio
+import heapq
+import uuid
+from datetime import datetime
+
+# Postgres NOTIFY channel on which bet mutations publish deadline changes to the expiry leader
+DEADLINES_CHANNEL = "bet_deadlines"
+
+
+class DeadlineHeap:
+    """In-process min-heap of bet deadlines that the expiry worker sleeps on.
+
+    Fed by the deadline changes bet mutations publish on DEADLINES_CHANNEL and by the
+    worker's periodic reconciliation.
+
+    Rescheduling or cancelling a bet does not search the heap: the current deadline of
+    each bet is kept in a dict and heap entries that no longer match it are dropped when
+    they reach the top. Not thread-safe; it is meant to be used from the event loop only.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[datetime, uuid.UUID]] = []
+        self._deadlines: dict[uuid.UUID, datetime] = {}
+        self._changed: asyncio.Event | None = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, bet_id: uuid.UUID, deadline: datetime | None) -> None:
+        """Set, move or (with ``None``) cancel the deadline of one bet, waking the waiter."""
+        if deadline is None:
+            self._deadlines.pop(bet_id, None)
+        elif self._deadlines.get(bet_id) != deadline:
+            self._deadlines[bet_id] = deadline
+            heapq.heappush(self._heap, (deadline, bet_id))
+        if self._changed is not None:
+            self._changed.set()
+
+    def next_deadline(self) -> datetime | None:
+        while self._heap:
+            deadline, bet_id = self._heap[0]
+            if self._deadlines.get(bet_id) == deadline:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: datetime) -> list[uuid.UUID]:
+        """Remove and return the bets whose deadline is at or before ``now``."""
+        due = []
+        while (deadline := self.next_deadline()) is not None and deadline <= now:
+            _, bet_id = heapq.heappop(self._heap)
+            del self._deadlines[bet_id]
+            due.append(bet_id)
+        return due
+
+    async def wait(self, timeout: float) -> None:
+        """Sleep for up to ``timeout`` seconds, returning early if a deadline is scheduled or cancelled."""
+        self._changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._changed.wait(), max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._changed = None
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._deadlines.clear()
+
+
+def format_deadlines(deadlines: list[tuple[uuid.UUID, datetime | None]]) -> str:
+    """Encode deadline changes as a NOTIFY payload: one "<bet_id> [<iso end_time>]" per line."""
+    return "\n".join(
+        f"{bet_id} {deadline.isoformat()}" if deadline else str(bet_id) for bet_id, deadline in deadlines
+    )
+
+
+def parse_deadlines(payload: str) -> list[tuple[uuid.UUID, datetime | None]]:
+    deadlines = []
+    for line in payload.splitlines():
+        bet_id, _, deadline = line.partition(" ")
+        deadlines.append((uuid.UUID(bet_id), datetime.fromisoformat(deadline) if deadline else None))
+    return deadlines
+
+
+bet_deadlines = DeadlineHeap()
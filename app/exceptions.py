@@ -33,6 +33,11 @@ class BetNotEditable(CircleBetError):
         super().__init__("Bet can only be edited while pending", 400)
 
 
+class BetHasEntries(CircleBetError):
+    def __init__(self):
+        super().__init__("Options cannot be replaced once other members have entered", 409)
+
+
 class BetClosedForEntry(CircleBetError):
     def __init__(self):
         super().__init__("This bet is not accepting new entries", 400)
@@ -53,5 +58,10 @@ class BetCannotEnd(CircleBetError):
         super().__init__("Bet must be active with at least two participants before it can be resolved", 400)
 
 
+class BetVersionConflict(CircleBetError):
+    def __init__(self):
+        super().__init__("Bet was changed by someone else; reload it and try again", 409)
+
+
 async def circlebet_error_handler(request: Request, exc: CircleBetError) -> JSONResponse:
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
@@ -1,10 +1,35 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.exceptions import CircleBetError, circlebet_error_handler
-from app.routes import auth, bets, circles, leaderboard, notifications, uploads
+from app.routes import admin, auth, bets, circles, leaderboard, notifications, uploads
+from app.tasks.expiry import run_expiry_worker
+from app.tasks.leaderboard import run_user_scores_reconciler
+from app.tasks.notifications import run_outbox_pruner, run_outbox_worker
+from app.tasks.runner import JobRunner
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Singleton jobs run in one worker process at a time; the outbox claims events with
+    # SKIP LOCKED, so every process drains it
+    runner = JobRunner()
+    runner.add("bet-expiry", run_expiry_worker)
+    runner.add("user-scores-reconcile", run_user_scores_reconciler)
+    runner.add("notification-outbox-prune", run_outbox_pruner)
+    workers = [asyncio.create_task(run_outbox_worker()), asyncio.create_task(runner.run())]
+    yield
+    for worker in workers:
+        worker.cancel()
+    for worker in workers:
+        with suppress(asyncio.CancelledError):
+            await worker
+
 
-app = FastAPI(title="CircleBet", version="0.1.0")
+app = FastAPI(title="CircleBet", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +47,7 @@ app.include_router(bets.router)
 app.include_router(leaderboard.router)
 app.include_router(notifications.router)
 app.include_router(uploads.router)
+app.include_router(admin.router)
 
 
 @app.get("/health")
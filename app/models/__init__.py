@@ -3,8 +3,13 @@ from app.models.bet_entry import BetEntry
 from app.models.bet_option import BetOption
 from app.models.circle import Circle
 from app.models.circle_member import CircleMember
+from app.models.daily_score import DailyScore
 from app.models.notification import Notification, NotificationType
+from app.models.notification_event import NotificationEvent
+from app.models.score_event import ScoreEvent
 from app.models.user import User
+from app.models.user_circle_stats import UserCircleStats
+from app.models.user_score import UserScore
 
 __all__ = [
     "User",
@@ -16,4 +21,9 @@ __all__ = [
     "BetEntry",
     "Notification",
     "NotificationType",
+    "NotificationEvent",
+    "ScoreEvent",
+    "DailyScore",
+    "UserScore",
+    "UserCircleStats",
 ]
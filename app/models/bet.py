@@ -2,7 +2,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Enum as SAEnum, ForeignKey, String, Text, func
+from sqlalchemy import Boolean, DateTime, Enum as SAEnum, ForeignKey, Index, Integer, String, Text, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -16,9 +16,20 @@ class BetStatus(str, enum.Enum):
 
 class Bet(Base):
     __tablename__ = "bets"
+    __table_args__ = (
+        Index("ix_bets_circle_id_created_at_id", "circle_id", text("created_at DESC"), text("id DESC")),
+        # Expiry sweeps range-scan only the bets that can still expire
+        Index(
+            "ix_bets_pending_end_time",
+            "end_time",
+            postgresql_where=text("is_time_limited AND status = 'PENDING'"),
+        ),
+    )
+    # Fetch server-generated created_at via RETURNING on INSERT
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
-    circle_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("circles.id"), nullable=False, index=True)
+    circle_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("circles.id"), nullable=False)
     creator_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
     title: Mapped[str] = mapped_column(String(500), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -35,6 +46,10 @@ class Bet(Base):
         ForeignKey("bet_options.id", use_alter=True, name="fk_bets_result_option_id"),
         nullable=True,
     )
+    entries_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    distinct_option_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # Bumped by every edit, settlement and activation; compared-and-swapped for optimistic concurrency
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
     circle: Mapped["Circle"] = relationship(back_populates="bets")
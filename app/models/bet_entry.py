@@ -10,6 +10,8 @@ from app.database import Base
 class BetEntry(Base):
     __tablename__ = "bet_entries"
     __table_args__ = (UniqueConstraint("bet_id", "user_id", name="uq_bet_entries_bet_user"),)
+    # Fetch server-generated entered_at via RETURNING on INSERT
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
     bet_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("bets.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -13,6 +13,7 @@ class BetOption(Base):
     bet_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("bets.id", ondelete="CASCADE"), nullable=False, index=True)
     label: Mapped[str] = mapped_column(String(200), nullable=False)
     position: Mapped[int] = mapped_column(Integer, nullable=False)
+    entry_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
 
     bet: Mapped["Bet"] = relationship(back_populates="options", foreign_keys=[bet_id])
     entries: Mapped[list["BetEntry"]] = relationship(back_populates="option")
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, String, Text, func
+from sqlalchemy import ForeignKey, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -16,6 +16,11 @@ class Circle(Base):
     icon_url: Mapped[str | None] = mapped_column(String(2048), nullable=True)
     invite_token: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True)
     creator_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
+    # Bumped by every bet mutation in the circle; keys the cached bet lists
+    bets_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # Maintained in the same transaction as joins and bet creates/deletes, so listings need no COUNT
+    member_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    bet_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
     creator: Mapped["User"] = relationship(back_populates="created_circles")
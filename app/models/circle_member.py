@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, Integer, func
+from sqlalchemy import ForeignKey, Index, Integer, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -9,6 +9,12 @@ from app.database import Base
 
 class CircleMember(Base):
     __tablename__ = "circle_members"
+    __table_args__ = (
+        # Leaderboard order; user_id breaks ties so ranked pages are stable
+        Index("ix_circle_members_circle_id_score", "circle_id", text("score DESC"), "user_id"),
+        # Member listing keyset order
+        Index("ix_circle_members_circle_id_joined_at", "circle_id", "joined_at", "user_id"),
+    )
 
     user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), primary_key=True)
     circle_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("circles.id"), primary_key=True)
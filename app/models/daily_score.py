@@ -0,0 +1,21 @@
+import uuid
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class DailyScore(Base):
+    """Per-member score change per UTC day, upserted alongside each score_events write.
+
+    The (circle_id, day, user_id) key makes a time-windowed leaderboard an index range scan.
+    """
+
+    __tablename__ = "daily_scores"
+
+    circle_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("circles.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    delta: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,47 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Enum as SAEnum, ForeignKey, Index, Integer, String, Text, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.notification import NotificationType
+
+
+class NotificationEvent(Base):
+    """Outbox row: one per notifying action, expanded into per-recipient notifications by the worker.
+
+    Recipients are not stored: they are resolved when the worker expands the event, so they are
+    the circle's members or the bet's entrants at delivery time. Processed rows are pruned after
+    NOTIFICATION_OUTBOX_RETENTION_HOURS; dead-lettered rows are kept for inspection.
+    """
+
+    __tablename__ = "notification_events"
+    __table_args__ = (
+        Index(
+            "ix_notification_events_pending",
+            "available_at",
+            postgresql_where=text("processed_at IS NULL"),
+        ),
+        Index(
+            "ix_notification_events_processed_at",
+            "processed_at",
+            postgresql_where=text("processed_at IS NOT NULL"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    type: Mapped[NotificationType] = mapped_column(
+        SAEnum(NotificationType, values_callable=lambda x: [e.value for e in x], native_enum=False, length=32),
+        nullable=False,
+    )
+    title: Mapped[str] = mapped_column(String(300), nullable=False)
+    message: Mapped[str] = mapped_column(Text, nullable=False)
+    bet_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("bets.id", ondelete="SET NULL"), nullable=True)
+    circle_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("circles.id", ondelete="SET NULL"), nullable=True)
+    actor_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
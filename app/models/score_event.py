@@ -0,0 +1,24 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ScoreEvent(Base):
+    """Append-only ledger of score changes; one row per participant per settled bet."""
+
+    __tablename__ = "score_events"
+    __table_args__ = (
+        Index("ix_score_events_circle_id_user_id_created_at", "circle_id", "user_id", "created_at"),
+        Index("ix_score_events_bet_id", "bet_id"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
+    circle_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("circles.id"), nullable=False)
+    bet_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("bets.id"), nullable=False)
+    delta: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class UserCircleStats(Base):
+    """Per-member betting record in one circle, upserted by end_bet as each bet settles.
+
+    Streaks follow settlement order. current_streak is signed: +n after n straight wins,
+    -n after n straight losses. scripts/backfill_user_circle_stats.py rebuilds the table
+    from settled bets.
+    """
+
+    __tablename__ = "user_circle_stats"
+
+    circle_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("circles.id"), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    bets_won: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    bets_lost: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    current_streak: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    best_win_streak: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    double_downs: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    double_downs_won: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class UserScore(Base):
+    """Cross-circle totals per user, kept current by end_bet and circle joins.
+
+    Derived from circle_members and settled bet_entries; the reconciliation job rebuilds
+    any row that has drifted from them.
+    """
+
+    __tablename__ = "user_scores"
+    __table_args__ = (
+        # Global leaderboard order; user_id breaks ties so ranked pages are stable
+        Index("ix_user_scores_total_score", text("total_score DESC"), "user_id"),
+    )
+
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_score: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    circles_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    bets_won: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    bets_lost: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
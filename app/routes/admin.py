@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Depends
+
+from app.auth.dependencies import require_admin
+from app.cache import cache_stats
+from app.models.user import User
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/cache-stats")
+async def get_cache_stats(_: User = Depends(require_admin)):
+    return cache_stats()
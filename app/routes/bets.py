@@ -1,17 +1,19 @@
 import uuid
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.dependencies import get_current_user
 from app.database import get_db
 from app.models.user import User
 from app.schemas.bet import (
+    BetBulkCreate,
     BetCreate,
     BetDetailResponse,
     BetEndRequest,
     BetEntryCreate,
     BetImageUpdate,
+    BetPage,
     BetResponse,
     BetUpdate,
 )
@@ -20,79 +22,130 @@ from app.services import bet as bet_service
 router = APIRouter(prefix="/bets", tags=["bets"])
 
 
+def _expected_version(if_match: str | None = Header(None)) -> int | None:
+    """Parse an If-Match ETag into the bet version the client last saw; absent or "*" matches any."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    try:
+        return int(if_match.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header")
+
+
+def _set_etag(response: Response, bet: BetResponse) -> None:
+    response.headers["ETag"] = f'"{bet.version}"'
+
+
 @router.post("", response_model=BetResponse, status_code=201)
 async def create_bet(
     req: BetCreate,
+    response: Response,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    bet = await bet_service.create_bet(db, user, req)
+    _set_etag(response, bet)
+    return bet
+
+
+@router.post("/bulk", response_model=list[BetResponse], status_code=201)
+async def create_bets_bulk(
+    req: BetBulkCreate,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await bet_service.create_bet(db, user, req)
+    # No ETag: it validates a single representation, and this creates many; each bet's
+    # version is in the body for clients that go on to edit one with If-Match
+    return await bet_service.create_bets_bulk(db, user, req)
 
 
-@router.get("/circle/{circle_id}", response_model=list[BetResponse])
+@router.get("/circle/{circle_id}", response_model=BetPage)
 async def list_circle_bets(
     circle_id: uuid.UUID,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
     bet_filter: str = Query("all", alias="filter", description="all | entered | created"),
     status: str | None = Query(None, description="PENDING | ACTIVE | FINISHED"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
 ):
-    return await bet_service.get_circle_bets(db, user, circle_id, list_filter=bet_filter, status_filter=status)
+    return await bet_service.get_circle_bets(
+        db, user, circle_id, list_filter=bet_filter, status_filter=status, limit=limit, cursor=cursor
+    )
 
 
 @router.get("/{bet_id}", response_model=BetDetailResponse)
 async def get_bet(
     bet_id: uuid.UUID,
+    response: Response,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await bet_service.get_bet(db, bet_id, user)
+    bet = await bet_service.get_bet(db, bet_id, user)
+    _set_etag(response, bet)
+    return bet
 
 
 @router.post("/{bet_id}/enter", response_model=BetResponse)
 async def enter_bet(
     bet_id: uuid.UUID,
     req: BetEntryCreate,
+    response: Response,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await bet_service.enter_bet(db, user, bet_id, req)
+    bet = await bet_service.enter_bet(db, user, bet_id, req)
+    _set_etag(response, bet)
+    return bet
 
 
 @router.post("/{bet_id}/end", response_model=BetResponse)
 async def end_bet(
     bet_id: uuid.UUID,
     req: BetEndRequest,
+    response: Response,
+    expected_version: int | None = Depends(_expected_version),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await bet_service.end_bet(db, user, bet_id, req)
+    bet = await bet_service.end_bet(db, user, bet_id, req, expected_version)
+    _set_etag(response, bet)
+    return bet
 
 
 @router.patch("/{bet_id}", response_model=BetResponse)
 async def update_bet(
     bet_id: uuid.UUID,
     req: BetUpdate,
+    response: Response,
+    expected_version: int | None = Depends(_expected_version),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await bet_service.update_bet(db, user, bet_id, req)
+    bet = await bet_service.update_bet(db, user, bet_id, req, expected_version)
+    _set_etag(response, bet)
+    return bet
 
 
 @router.patch("/{bet_id}/image", response_model=BetResponse)
 async def update_bet_image(
     bet_id: uuid.UUID,
     req: BetImageUpdate,
+    response: Response,
+    expected_version: int | None = Depends(_expected_version),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await bet_service.update_bet_image(db, user, bet_id, req)
+    bet = await bet_service.update_bet_image(db, user, bet_id, req, expected_version)
+    _set_etag(response, bet)
+    return bet
 
 
 @router.delete("/{bet_id}", status_code=204)
 async def delete_bet(
     bet_id: uuid.UUID,
+    expected_version: int | None = Depends(_expected_version),
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    await bet_service.delete_bet(db, user, bet_id)
+    await bet_service.delete_bet(db, user, bet_id, expected_version)
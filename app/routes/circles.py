@@ -1,13 +1,31 @@
 import uuid
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.dependencies import get_current_user
 from app.database import get_db
 from app.models.user import User
-from app.schemas.circle import CircleCreate, CircleIconUpdate, CircleMemberResponse, CircleResponse
-from app.services.circle import create_circle, get_circle, get_circle_members, get_user_circles, join_circle, update_circle_icon
+from app.schemas.circle import (
+    CircleCreate,
+    CircleDashboardResponse,
+    CircleIconUpdate,
+    CircleMemberPage,
+    CircleResponse,
+    MemberStatsResponse,
+)
+from app.services.circle import (
+    create_circle,
+    get_circle,
+    get_circle_members,
+    get_member_stats,
+    get_user_circles,
+    join_circle,
+    stream_circle_members,
+    update_circle_icon,
+)
+from app.services.dashboard import get_circle_dashboard
 
 router = APIRouter(prefix="/circles", tags=["circles"])
 
@@ -38,6 +56,15 @@ async def get(
     return await get_circle(db, circle_id, user)
 
 
+@router.get("/{circle_id}/dashboard", response_model=CircleDashboardResponse)
+async def dashboard(
+    circle_id: uuid.UUID,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    return await get_circle_dashboard(db, user, circle_id)
+
+
 @router.post("/join/{invite_token}", response_model=CircleResponse)
 async def join(
     invite_token: str,
@@ -57,19 +84,27 @@ async def update_icon(
     return await update_circle_icon(db, user, circle_id, req.icon_url)
 
 
-@router.get("/{circle_id}/members", response_model=list[CircleMemberResponse])
+@router.get("/{circle_id}/members", response_model=CircleMemberPage)
 async def members(
     circle_id: uuid.UUID,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    response_format: str = Query("json", alias="format", description="json | ndjson"),
+):
+    if response_format == "ndjson":
+        # One member per line, every member after the cursor; limit does not apply. The generator reads
+        # through the request's session, which FastAPI >= 0.118 keeps open until the response has been sent
+        return StreamingResponse(stream_circle_members(db, circle_id, cursor), media_type="application/x-ndjson")
+    return await get_circle_members(db, circle_id, limit=limit, cursor=cursor)
+
+
+@router.get("/{circle_id}/members/{user_id}/stats", response_model=MemberStatsResponse)
+async def member_stats(
+    circle_id: uuid.UUID,
+    user_id: uuid.UUID,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    members = await get_circle_members(db, circle_id)
-    return [
-        CircleMemberResponse(
-            user_id=m.user_id,
-            display_name=m.user.display_name,
-            score=m.score,
-            joined_at=m.joined_at,
-        )
-        for m in members
-    ]
+    return await get_member_stats(db, user, circle_id, user_id)
@@ -1,13 +1,13 @@
 import uuid
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.dependencies import get_current_user
 from app.database import get_db
 from app.models.user import User
-from app.schemas.leaderboard import LeaderboardEntry
-from app.services.leaderboard import get_circle_leaderboard
+from app.schemas.leaderboard import GlobalLeaderboardEntry, LeaderboardEntry
+from app.services.leaderboard import get_circle_leaderboard, get_global_leaderboard
 
 router = APIRouter(tags=["leaderboard"])
 
@@ -17,5 +17,28 @@ async def leaderboard(
     circle_id: uuid.UUID,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    around_me: bool = Query(False, description="Also return the caller's rank and neighbours"),
+    radius: int = Query(2, ge=0, le=25, description="Neighbours on each side of the caller"),
+    window: str = Query("all", description="all | week | month | season"),
 ):
-    return await get_circle_leaderboard(db, circle_id)
+    return await get_circle_leaderboard(
+        db,
+        circle_id,
+        limit=limit,
+        offset=offset,
+        around_user_id=user.id if around_me else None,
+        radius=radius,
+        window=window,
+    )
+
+
+@router.get("/leaderboard/global", response_model=list[GlobalLeaderboardEntry])
+async def global_leaderboard(
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+):
+    return await get_global_leaderboard(db, limit=limit, offset=offset)
@@ -31,10 +31,16 @@ class BetResponse(BaseModel):
     options: list[BetOptionResponse]
     result_option_id: uuid.UUID | None
     entries_count: int
+    version: int
     created_at: datetime
     my_entry: BetEntryResponse | None = None
 
 
+class BetPage(BaseModel):
+    items: list[BetResponse]
+    next_cursor: str | None = None
+
+
 class BetDetailResponse(BetResponse):
     option_counts: dict[str, int] = Field(default_factory=dict)
 
@@ -65,6 +71,17 @@ class BetCreate(BaseModel):
         return self
 
 
+class BetBulkCreate(BaseModel):
+    circle_id: uuid.UUID
+    bets: list[BetCreate] = Field(min_length=1, max_length=50)
+
+    @model_validator(mode="after")
+    def validate_same_circle(self) -> "BetBulkCreate":
+        if any(b.circle_id != self.circle_id for b in self.bets):
+            raise ValueError("All bets must belong to circle_id")
+        return self
+
+
 class BetUpdate(BaseModel):
     title: str | None = Field(default=None, min_length=1, max_length=500)
     description: str | None = None
@@ -3,6 +3,9 @@ from datetime import datetime
 
 from pydantic import BaseModel, Field
 
+from app.schemas.bet import BetPage
+from app.schemas.leaderboard import LeaderboardEntry
+
 
 class CircleCreate(BaseModel):
     name: str = Field(min_length=3, max_length=20)
@@ -31,3 +34,31 @@ class CircleMemberResponse(BaseModel):
     display_name: str
     score: int
     joined_at: datetime
+
+
+class CircleMemberPage(BaseModel):
+    items: list[CircleMemberResponse]
+    next_cursor: str | None = None
+
+
+class MemberStatsResponse(BaseModel):
+    user_id: uuid.UUID
+    circle_id: uuid.UUID
+    bets_won: int = 0
+    bets_lost: int = 0
+    win_rate: float | None = None
+    current_streak: int = 0
+    best_win_streak: int = 0
+    double_downs: int = 0
+    double_downs_won: int = 0
+    double_down_success_rate: float | None = None
+
+
+class CircleDashboardResponse(BaseModel):
+    """Everything the circle page opens with; each list is a bounded preview."""
+
+    circle: CircleResponse
+    leaderboard: list[LeaderboardEntry]
+    members: CircleMemberPage
+    bets: BetPage
+    unread_count: int
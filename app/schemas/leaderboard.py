@@ -8,3 +8,13 @@ class LeaderboardEntry(BaseModel):
     user_id: uuid.UUID
     display_name: str
     score: int
+
+
+class GlobalLeaderboardEntry(BaseModel):
+    rank: int
+    user_id: uuid.UUID
+    display_name: str
+    total_score: int
+    circles_count: int
+    bets_won: int
+    bets_lost: int
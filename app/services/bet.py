@@ -2,26 +2,42 @@ import uuid
 from datetime import datetime, timezone
 
 from fastapi import HTTPException, status
-from sqlalchemy import delete, func, select
+from sqlalchemy import ColumnElement, case, delete, func, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.cache import LRUCache
+from app.config import settings
+from app.database import insert_from_select
+from app.deadlines import DEADLINES_CHANNEL, format_deadlines
 from app.exceptions import (
     AlreadyEnteredBet,
     BetCannotEnd,
     BetClosedForEntry,
+    BetHasEntries,
     BetNotEditable,
     BetNotFound,
+    BetVersionConflict,
     NotBetCreator,
     NotCircleMember,
 )
 from app.models.bet import Bet, BetStatus
 from app.models.bet_entry import BetEntry
 from app.models.bet_option import BetOption
+from app.models.circle import Circle
 from app.models.circle_member import CircleMember
-from app.models.notification import Notification, NotificationType
+from app.models.daily_score import DailyScore
+from app.models.notification import NotificationType
+from app.models.score_event import ScoreEvent
 from app.models.user import User
+from app.models.user_circle_stats import UserCircleStats
+from app.models.user_score import UserScore
+from app.pagination import decode_cursor, encode_cursor
 from app.schemas.bet import (
+    BetBulkCreate,
     BetCreate,
     BetDetailResponse,
     BetEndRequest,
@@ -29,9 +45,15 @@ from app.schemas.bet import (
     BetEntryResponse,
     BetImageUpdate,
     BetOptionResponse,
+    BetPage,
     BetResponse,
     BetUpdate,
 )
+from app.services.leaderboard import invalidate_leaderboards
+from app.services.membership import cached_membership, remember_membership, require_member
+from app.services.notification import enqueue_event
+
+bet_list_cache: LRUCache[tuple, BetPage] = LRUCache("bet_lists", settings.BET_LIST_CACHE_SIZE)
 
 
 def _now_utc() -> datetime:
@@ -54,19 +76,7 @@ def _entry_to_response(e: BetEntry) -> BetEntryResponse:
     )
 
 
-async def _bet_to_response(
-    db: AsyncSession, bet: Bet, current_user_id: uuid.UUID | None
-) -> BetResponse:
-    if not bet.options:
-        await db.refresh(bet, ["options"])
-    count_result = await db.execute(select(func.count()).select_from(BetEntry).where(BetEntry.bet_id == bet.id))
-    entries_count = int(count_result.scalar_one())
-    my_entry: BetEntryResponse | None = None
-    if current_user_id:
-        er = await db.execute(select(BetEntry).where(BetEntry.bet_id == bet.id, BetEntry.user_id == current_user_id))
-        row = er.scalar_one_or_none()
-        if row:
-            my_entry = _entry_to_response(row)
+def _build_bet_response(bet: Bet, my_entry: BetEntryResponse | None) -> BetResponse:
     opts = sorted(bet.options, key=lambda x: x.position)
     return BetResponse(
         id=bet.id,
@@ -80,35 +90,262 @@ async def _bet_to_response(
         end_time=bet.end_time,
         options=[BetOptionResponse(id=o.id, label=o.label, position=o.position) for o in opts],
         result_option_id=bet.result_option_id,
-        entries_count=entries_count,
+        entries_count=bet.entries_count,
+        version=bet.version,
         created_at=bet.created_at,
         my_entry=my_entry,
     )
 
 
-async def _notify_bet_created(
-    db: AsyncSession, circle_id: uuid.UUID, bet_id: uuid.UUID, title: str, creator_id: uuid.UUID
+async def _get_entry(db: AsyncSession, bet_id: uuid.UUID, user_id: uuid.UUID) -> BetEntry | None:
+    er = await db.execute(select(BetEntry).where(BetEntry.bet_id == bet_id, BetEntry.user_id == user_id))
+    return er.scalar_one_or_none()
+
+
+async def _bet_to_response(
+    db: AsyncSession, bet: Bet, current_user_id: uuid.UUID | None
+) -> BetResponse:
+    if not bet.options:
+        await db.refresh(bet, ["options"])
+    my_entry: BetEntryResponse | None = None
+    if current_user_id:
+        row = await _get_entry(db, bet.id, current_user_id)
+        if row:
+            my_entry = _entry_to_response(row)
+    return _build_bet_response(bet, my_entry)
+
+
+async def _with_my_entries(
+    db: AsyncSession, items: list[BetResponse], current_user_id: uuid.UUID
+) -> list[BetResponse]:
+    """Overlay the caller's entries onto shared (user-independent) bet responses in one query."""
+    if not items:
+        return []
+    er = await db.execute(
+        select(BetEntry).where(
+            BetEntry.bet_id.in_([b.id for b in items]), BetEntry.user_id == current_user_id
+        )
+    )
+    my_entries = {e.bet_id: _entry_to_response(e) for e in er.scalars().all()}
+    return [b.model_copy(update={"my_entry": my_entries.get(b.id)}) for b in items]
+
+
+async def _touch_circle(db: AsyncSession, circle_id: uuid.UUID, bets_added: int = 0) -> None:
+    """Bump the circle's bets_version so cached bet lists for it are no longer served.
+
+    ``bets_added`` (negative for deletes) is applied to circles.bet_count in the same UPDATE.
+    """
+    values = {"bets_version": Circle.bets_version + 1}
+    if bets_added:
+        values["bet_count"] = Circle.bet_count + bets_added
+    await db.execute(
+        update(Circle)
+        .where(Circle.id == circle_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _compare_and_swap(
+    db: AsyncSession, bet: Bet, expected_version: int | None, *conditions: ColumnElement[bool], **values
 ) -> None:
+    """Write ``values`` to the bet and bump its version, only if the version is still the one read.
+
+    ``expected_version`` is the client's If-Match; without it the version loaded by this
+    request is used, which still keeps concurrent read-modify-writes from interleaving.
+    Extra ``conditions`` are checked under the same row lock. Raises BetVersionConflict when
+    the bet has moved on or a condition no longer holds.
+    """
+    if expected_version is not None and expected_version != bet.version:
+        raise BetVersionConflict()
     result = await db.execute(
-        select(CircleMember.user_id).where(
+        update(Bet)
+        .where(Bet.id == bet.id, Bet.version == bet.version, *conditions)
+        .values(version=Bet.version + 1, **values)
+        .returning(Bet.version)
+        .execution_options(synchronize_session=False)
+    )
+    version = result.scalar_one_or_none()
+    if version is None:
+        raise BetVersionConflict()
+    for key, value in values.items():
+        set_committed_value(bet, key, value)
+    set_committed_value(bet, "version", version)
+
+
+async def _publish_deadlines(db: AsyncSession, deadlines: list[tuple[uuid.UUID, datetime | None]]) -> None:
+    """NOTIFY the expiry leader of set, moved or cancelled (None) deadlines; delivered on commit only."""
+    await db.execute(select(func.pg_notify(DEADLINES_CHANNEL, format_deadlines(deadlines))))
+
+
+async def _recount_entries(db: AsyncSession, bet: Bet) -> None:
+    """Rebuild the denormalized entry counters of one bet from bet_entries."""
+    result = await db.execute(
+        update(BetOption)
+        .where(BetOption.bet_id == bet.id)
+        .values(
+            entry_count=select(func.count())
+            .where(BetEntry.option_id == BetOption.id)
+            .scalar_subquery()
+        )
+        .returning(BetOption.id, BetOption.entry_count)
+        .execution_options(synchronize_session=False)
+    )
+    option_counts = dict(result.all())
+    for o in bet.options:
+        set_committed_value(o, "entry_count", option_counts.get(o.id, 0))
+
+    result = await db.execute(
+        update(Bet)
+        .where(Bet.id == bet.id)
+        .values(
+            entries_count=select(func.count())
+            .where(BetEntry.bet_id == bet.id)
+            .scalar_subquery(),
+            distinct_option_count=select(func.count(BetEntry.option_id.distinct()))
+            .where(BetEntry.bet_id == bet.id)
+            .scalar_subquery(),
+        )
+        .returning(Bet.entries_count, Bet.distinct_option_count)
+        .execution_options(synchronize_session=False)
+    )
+    entries_count, distinct_option_count = result.one()
+    set_committed_value(bet, "entries_count", entries_count)
+    set_committed_value(bet, "distinct_option_count", distinct_option_count)
+
+
+async def _settle_scores(
+    db: AsyncSession, bet_id: uuid.UUID, circle_id: uuid.UUID, win_id: uuid.UUID
+) -> None:
+    """Apply +delta / -delta to every participant's score and record it in the score ledger.
+
+    delta is 2 for double-down entries and 1 otherwise. Six set-based statements regardless
+    of participant count: a SELECT ... FOR UPDATE of the participants' circle_members rows, the
+    circle_members UPDATE ... FROM (incremented in the database, so bets settling concurrently in
+    the same circle cannot lose updates), the score_events INSERT ... SELECT, and the daily_scores,
+    user_scores and user_circle_stats upserts. Every row lock is taken in user_id order, so
+    concurrent settlements with overlapping participants queue up instead of deadlocking.
+    """
+    stake = case((BetEntry.is_double_down, 2), else_=1)
+    delta = case((BetEntry.option_id == win_id, stake), else_=-stake)
+    # Entering requires membership and members cannot leave, so every entrant has a row here.
+    # The UPDATE below locks rows in whatever order its plan visits them, so take the locks first
+    participants = select(BetEntry.user_id).where(BetEntry.bet_id == bet_id)
+    await db.execute(
+        select(CircleMember.user_id)
+        .where(CircleMember.circle_id == circle_id, CircleMember.user_id.in_(participants))
+        .order_by(CircleMember.user_id)
+        .with_for_update()
+    )
+    await db.execute(
+        update(CircleMember)
+        .where(
             CircleMember.circle_id == circle_id,
-            CircleMember.user_id != creator_id,
+            CircleMember.user_id == BetEntry.user_id,
+            BetEntry.bet_id == bet_id,
         )
+        .values(score=CircleMember.score + delta)
+        .execution_options(synchronize_session=False)
     )
-    for (uid,) in result.all():
-        db.add(
-            Notification(
-                user_id=uid,
-                type=NotificationType.BET_CREATED,
-                title="New bet in your circle",
-                message=f'A new bet was created: "{title}"',
-                bet_id=bet_id,
-                circle_id=circle_id,
-            )
+
+    settled_at = _now_utc()
+    await db.execute(
+        insert_from_select(
+            ScoreEvent,
+            ["user_id", "circle_id", "bet_id", "delta", "created_at"],
+            participants.add_columns(
+                literal(circle_id, ScoreEvent.circle_id.type),
+                literal(bet_id, ScoreEvent.bet_id.type),
+                delta,
+                literal(settled_at, ScoreEvent.created_at.type),
+            ),
+        )
+    )
+    rollup = pg_insert(DailyScore).from_select(
+        ["user_id", "circle_id", "day", "delta"],
+        participants.add_columns(
+            literal(circle_id, DailyScore.circle_id.type),
+            literal(settled_at.date(), DailyScore.day.type),
+            delta,
+        ).order_by(BetEntry.user_id),
+    )
+    await db.execute(
+        rollup.on_conflict_do_update(
+            index_elements=[DailyScore.circle_id, DailyScore.day, DailyScore.user_id],
+            set_={"delta": DailyScore.delta + rollup.excluded.delta},
+        )
+    )
+    won = case((BetEntry.option_id == win_id, 1), else_=0)
+    totals = pg_insert(UserScore).from_select(
+        ["user_id", "total_score", "bets_won", "bets_lost"],
+        participants.add_columns(delta, won, 1 - won).order_by(BetEntry.user_id),
+    )
+    await db.execute(
+        totals.on_conflict_do_update(
+            index_elements=[UserScore.user_id],
+            set_={
+                "total_score": UserScore.total_score + totals.excluded.total_score,
+                "bets_won": UserScore.bets_won + totals.excluded.bets_won,
+                "bets_lost": UserScore.bets_lost + totals.excluded.bets_lost,
+                "updated_at": func.now(),
+            },
+        )
+    )
+    doubled = case((BetEntry.is_double_down, 1), else_=0)
+    stats = pg_insert(UserCircleStats).from_select(
+        [
+            "user_id",
+            "circle_id",
+            "bets_won",
+            "bets_lost",
+            "current_streak",
+            "best_win_streak",
+            "double_downs",
+            "double_downs_won",
+        ],
+        participants.add_columns(
+            literal(circle_id, UserCircleStats.circle_id.type), won, 1 - won, 2 * won - 1, won, doubled, doubled * won
+        ).order_by(BetEntry.user_id),
+    )
+    # A win extends a winning streak or starts a new one at +1; a loss does the same downwards
+    streak = case(
+        (
+            stats.excluded.bets_won == 1,
+            case((UserCircleStats.current_streak > 0, UserCircleStats.current_streak + 1), else_=1),
+        ),
+        else_=case((UserCircleStats.current_streak < 0, UserCircleStats.current_streak - 1), else_=-1),
+    )
+    await db.execute(
+        stats.on_conflict_do_update(
+            index_elements=[UserCircleStats.circle_id, UserCircleStats.user_id],
+            set_={
+                "bets_won": UserCircleStats.bets_won + stats.excluded.bets_won,
+                "bets_lost": UserCircleStats.bets_lost + stats.excluded.bets_lost,
+                "current_streak": streak,
+                "best_win_streak": func.greatest(UserCircleStats.best_win_streak, streak),
+                "double_downs": UserCircleStats.double_downs + stats.excluded.double_downs,
+                "double_downs_won": UserCircleStats.double_downs_won + stats.excluded.double_downs_won,
+                "updated_at": func.now(),
+            },
         )
+    )
+
+
+def _notify_bet_created(
+    db: AsyncSession, circle_id: uuid.UUID, bet_id: uuid.UUID, title: str, creator_id: uuid.UUID
+) -> None:
+    enqueue_event(
+        db,
+        NotificationType.BET_CREATED,
+        "New bet in your circle",
+        f'A new bet was created: "{title}"',
+        bet_id,
+        circle_id,
+        actor_id=creator_id,
+    )
 
 
-async def _notify_new_participant(
+def _notify_new_participant(
     db: AsyncSession,
     bet_id: uuid.UUID,
     circle_id: uuid.UUID,
@@ -116,50 +353,36 @@ async def _notify_new_participant(
     new_user_id: uuid.UUID,
     display_name: str,
 ) -> None:
-    result = await db.execute(
-        select(BetEntry.user_id).where(BetEntry.bet_id == bet_id, BetEntry.user_id != new_user_id)
-    )
-    for (uid,) in result.all():
-        db.add(
-            Notification(
-                user_id=uid,
-                type=NotificationType.NEW_PARTICIPANT,
-                title="Someone joined your bet",
-                message=f"{display_name} entered a bet in your circle: {title}",
-                bet_id=bet_id,
-                circle_id=circle_id,
-            )
-        )
+    enqueue_event(
+        db,
+        NotificationType.NEW_PARTICIPANT,
+        "Someone joined your bet",
+        f"{display_name} entered a bet in your circle: {title}",
+        bet_id,
+        circle_id,
+        actor_id=new_user_id,
+    )
 
 
-async def _notify_bet_ended(
+def _notify_bet_ended(
     db: AsyncSession, bet_id: uuid.UUID, circle_id: uuid.UUID, title: str, result_label: str
 ) -> None:
-    result = await db.execute(select(BetEntry.user_id).where(BetEntry.bet_id == bet_id))
-    user_ids = {row[0] for row in result.all()}
-    for uid in user_ids:
-        db.add(
-            Notification(
-                user_id=uid,
-                type=NotificationType.BET_ENDED,
-                title="Bet resolved",
-                message=f'"{title}" ended. Result: {result_label}',
-                bet_id=bet_id,
-                circle_id=circle_id,
-            )
-        )
-
+    enqueue_event(
+        db,
+        NotificationType.BET_ENDED,
+        "Bet resolved",
+        f'"{title}" ended. Result: {result_label}',
+        bet_id,
+        circle_id,
+    )
 
-async def create_bet(db: AsyncSession, user: User, req: BetCreate) -> BetResponse:
-    member = await db.get(CircleMember, (user.id, req.circle_id))
-    if not member:
-        raise NotCircleMember()
 
+def _new_bet(user: User, req: BetCreate) -> Bet:
     end_time = _aware(req.end_time)
     if req.is_time_limited and end_time and end_time <= _now_utc():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="End time must be in the future")
 
-    bet = Bet(
+    return Bet(
         circle_id=req.circle_id,
         creator_id=user.id,
         title=req.title.strip(),
@@ -168,20 +391,54 @@ async def create_bet(db: AsyncSession, user: User, req: BetCreate) -> BetRespons
         status=BetStatus.PENDING,
         is_time_limited=req.is_time_limited,
         end_time=end_time if req.is_time_limited else None,
+        options=[BetOption(label=label, position=i) for i, label in enumerate(req.options)],
     )
+
+
+async def create_bet(db: AsyncSession, user: User, req: BetCreate) -> BetResponse:
+    """Queries: membership check (none when cached), bet INSERT ... RETURNING, options INSERT, outbox
+    INSERT, circle version and bet_count bump; plus a deadline NOTIFY for time-limited bets."""
+    await require_member(db, user.id, req.circle_id)
+
+    bet = _new_bet(user, req)
     db.add(bet)
     await db.flush()
 
-    for i, label in enumerate(req.options):
-        db.add(BetOption(bet_id=bet.id, label=label, position=i))
+    _notify_bet_created(db, req.circle_id, bet.id, bet.title, user.id)
+    await _touch_circle(db, req.circle_id, bets_added=1)
+    if bet.is_time_limited:
+        await _publish_deadlines(db, [(bet.id, bet.end_time)])
+    await db.commit()
+    return _build_bet_response(bet, None)
+
+
+async def create_bets_bulk(db: AsyncSession, user: User, req: BetBulkCreate) -> list[BetResponse]:
+    """Queries: membership check (none when cached), one multi-row bets INSERT ... RETURNING, one
+    multi-row options INSERT, outbox INSERT, circle version and bet_count bump and at most one deadline
+    NOTIFY — independent of the number of bets."""
+    await require_member(db, user.id, req.circle_id)
+
+    bets = [_new_bet(user, b) for b in req.bets]
+    db.add_all(bets)
     await db.flush()
 
-    await _notify_bet_created(db, req.circle_id, bet.id, bet.title, user.id)
+    if len(bets) == 1:
+        _notify_bet_created(db, req.circle_id, bets[0].id, bets[0].title, user.id)
+    else:
+        enqueue_event(
+            db,
+            NotificationType.BET_CREATED,
+            "New bets in your circle",
+            f"{len(bets)} new bets were created",
+            None,
+            req.circle_id,
+            actor_id=user.id,
+        )
+    await _touch_circle(db, req.circle_id, bets_added=len(bets))
+    if deadlines := [(b.id, b.end_time) for b in bets if b.is_time_limited]:
+        await _publish_deadlines(db, deadlines)
     await db.commit()
-    await db.refresh(bet)
-    result = await db.execute(select(Bet).options(selectinload(Bet.options)).where(Bet.id == bet.id))
-    bet = result.scalar_one()
-    return await _bet_to_response(db, bet, user.id)
+    return [_build_bet_response(b, None) for b in bets]
 
 
 async def get_bet(db: AsyncSession, bet_id: uuid.UUID, user: User) -> BetDetailResponse:
@@ -192,28 +449,12 @@ async def get_bet(db: AsyncSession, bet_id: uuid.UUID, user: User) -> BetDetailR
     if not bet:
         raise BetNotFound()
 
-    member = await db.get(CircleMember, (user.id, bet.circle_id))
-    if not member:
-        raise NotCircleMember()
+    await require_member(db, user.id, bet.circle_id)
 
     base = await _bet_to_response(db, bet, user.id)
-    counts: dict[str, int] = {}
-    if bet.status == BetStatus.FINISHED:
-        for o in bet.options:
-            cnt = await db.execute(
-                select(func.count()).select_from(BetEntry).where(BetEntry.option_id == o.id)
-            )
-            counts[str(o.id)] = int(cnt.scalar_one())
-    else:
-        for o in bet.options:
-            cnt = await db.execute(
-                select(func.count()).select_from(BetEntry).where(BetEntry.option_id == o.id)
-            )
-            counts[str(o.id)] = int(cnt.scalar_one())
-
     return BetDetailResponse(
         **base.model_dump(),
-        option_counts=counts,
+        option_counts={str(o.id): o.entry_count for o in bet.options},
     )
 
 
@@ -223,14 +464,48 @@ async def get_circle_bets(
     circle_id: uuid.UUID,
     list_filter: str = "all",
     status_filter: str | None = None,
-) -> list[BetResponse]:
-    member = await db.get(CircleMember, (user.id, circle_id))
-    if not member:
+    limit: int = 50,
+    cursor: str | None = None,
+) -> BetPage:
+    known = cached_membership(db, user.id, circle_id)
+    if known is False:
+        raise NotCircleMember()
+    stmt = select(Circle.bets_version).where(Circle.id == circle_id)
+    if known is None:
+        # Authorize in the same query that reads the version
+        stmt = stmt.join(CircleMember, CircleMember.circle_id == Circle.id).where(CircleMember.user_id == user.id)
+    version = (await db.execute(stmt)).scalar_one_or_none()
+    if known is None:
+        remember_membership(db, user.id, circle_id, version is not None)
+    if version is None:
         raise NotCircleMember()
 
     if list_filter not in ("all", "entered", "created"):
         list_filter = "all"
+    sf = status_filter.upper() if status_filter else None
+    if sf not in ("PENDING", "ACTIVE", "FINISHED"):
+        sf = None
+
+    # Only the unfiltered list is the same for every member, so only it is cached
+    key = (circle_id, version, sf, limit, cursor)
+    page = bet_list_cache.get(key) if list_filter == "all" else None
+    if page is None:
+        page = await _load_circle_bets(db, user, circle_id, list_filter, sf, limit, cursor)
+        if list_filter == "all":
+            bet_list_cache.set(key, page)
+    return BetPage(items=await _with_my_entries(db, page.items, user.id), next_cursor=page.next_cursor)
 
+
+async def _load_circle_bets(
+    db: AsyncSession,
+    user: User,
+    circle_id: uuid.UUID,
+    list_filter: str,
+    status_filter: str | None,
+    limit: int,
+    cursor: str | None,
+) -> BetPage:
+    """One page of bets without the caller's entries."""
     stmt = select(Bet).options(selectinload(Bet.options)).where(Bet.circle_id == circle_id)
     if list_filter == "entered":
         sub = select(BetEntry.bet_id).where(BetEntry.user_id == user.id)
@@ -239,17 +514,24 @@ async def get_circle_bets(
         stmt = stmt.where(Bet.creator_id == user.id)
 
     if status_filter:
-        sf = status_filter.upper()
-        if sf in ("PENDING", "ACTIVE", "FINISHED"):
-            stmt = stmt.where(Bet.status == BetStatus(sf))
+        stmt = stmt.where(Bet.status == BetStatus(status_filter))
 
-    stmt = stmt.order_by(Bet.created_at.desc())
+    if cursor:
+        stmt = stmt.where(tuple_(Bet.created_at, Bet.id) < decode_cursor(cursor))
+
+    # Fetch one extra row to learn whether another page exists
+    stmt = stmt.order_by(Bet.created_at.desc(), Bet.id.desc()).limit(limit + 1)
     result = await db.execute(stmt)
-    bets = result.scalars().unique().all()
-    return [await _bet_to_response(db, b, user.id) for b in bets]
+    bets = list(result.scalars().unique().all())
+    next_cursor = encode_cursor(bets[limit - 1].created_at, bets[limit - 1].id) if len(bets) > limit else None
+    return BetPage(items=[_build_bet_response(b, None) for b in bets[:limit]], next_cursor=next_cursor)
 
 
 async def enter_bet(db: AsyncSession, user: User, bet_id: uuid.UUID, req: BetEntryCreate) -> BetResponse:
+    """Queries: bet + options, membership check (none when cached), bet lock + entries counter UPDATE,
+    entry INSERT ... ON CONFLICT DO NOTHING RETURNING, option counter UPDATE, outbox INSERT, circle
+    version bump; plus a distinct-options + activation UPDATE when the option gets its first entry
+    and a deadline NOTIFY when a time-limited bet activates."""
     result = await db.execute(
         select(Bet).options(selectinload(Bet.options)).where(Bet.id == bet_id)
     )
@@ -257,66 +539,113 @@ async def enter_bet(db: AsyncSession, user: User, bet_id: uuid.UUID, req: BetEnt
     if not bet:
         raise BetNotFound()
 
-    member = await db.get(CircleMember, (user.id, bet.circle_id))
-    if not member:
-        raise NotCircleMember()
+    await require_member(db, user.id, bet.circle_id)
 
-    if bet.status == BetStatus.FINISHED:
+    if bet.status not in (BetStatus.PENDING, BetStatus.ACTIVE):
         raise BetClosedForEntry()
 
-    existing = await db.execute(select(BetEntry).where(BetEntry.bet_id == bet.id, BetEntry.user_id == user.id))
-    if existing.scalar_one_or_none():
-        raise AlreadyEnteredBet()
-
     if bet.is_time_limited and bet.end_time:
         et = _aware(bet.end_time)
         if et and _now_utc() >= et:
             raise BetClosedForEntry()
 
-    option_ids = {o.id for o in bet.options}
-    if req.option_id not in option_ids:
+    option = next((o for o in bet.options if o.id == req.option_id), None)
+    if option is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid option for this bet")
 
-    if bet.status == BetStatus.PENDING:
-        db.add(
-            BetEntry(
+    # Lock the bet row first, as update_bet's compare-and-swap does, so an entry and an option
+    # edit cannot deadlock; entries to one bet then run one at a time. A bet finished
+    # concurrently matches no row.
+    locked = await db.execute(
+        update(Bet)
+        .where(Bet.id == bet.id, Bet.status.in_([BetStatus.PENDING, BetStatus.ACTIVE]))
+        .values(entries_count=Bet.entries_count + 1)
+        .returning(Bet.entries_count, Bet.distinct_option_count, Bet.status, Bet.version)
+        .execution_options(synchronize_session=False)
+    )
+    counters = locked.one_or_none()
+    if counters is None:
+        raise BetClosedForEntry()
+
+    # The unique (bet_id, user_id) constraint arbitrates concurrent entries by the same user
+    try:
+        entry_result = await db.execute(
+            pg_insert(BetEntry)
+            .values(
                 bet_id=bet.id,
                 user_id=user.id,
                 option_id=req.option_id,
                 is_double_down=req.is_double_down,
             )
+            .on_conflict_do_nothing(constraint="uq_bet_entries_bet_user")
+            .returning(BetEntry.id, BetEntry.entered_at)
         )
-        await db.flush()
-        # Activate only once at least 2 distinct options are represented
-        distinct = await db.execute(
-            select(func.count(BetEntry.option_id.distinct()))
-            .where(BetEntry.bet_id == bet.id)
+    except IntegrityError:
+        # The option was replaced by an edit committed after the bet was read
+        raise BetVersionConflict()
+    inserted = entry_result.one_or_none()
+    if inserted is None:
+        raise AlreadyEnteredBet()
+
+    option_count = (
+        await db.execute(
+            update(BetOption)
+            .where(BetOption.id == req.option_id)
+            .values(entry_count=BetOption.entry_count + 1)
+            .returning(BetOption.entry_count)
+            .execution_options(synchronize_session=False)
         )
-        if int(distinct.scalar_one()) >= 2:
-            bet.status = BetStatus.ACTIVE
-    elif bet.status == BetStatus.ACTIVE:
-        db.add(
-            BetEntry(
-                bet_id=bet.id,
-                user_id=user.id,
-                option_id=req.option_id,
-                is_double_down=req.is_double_down,
+    ).scalar_one()
+    if option_count == 1:
+        # A newly represented option; the bet activates once at least 2 are. Activation bumps the
+        # version so pending-only edits read before it fail their compare-and-swap.
+        activates = counters.status == BetStatus.PENDING and counters.distinct_option_count + 1 >= 2
+        counters = (
+            await db.execute(
+                update(Bet)
+                .where(Bet.id == bet.id)
+                .values(
+                    distinct_option_count=Bet.distinct_option_count + 1,
+                    status=BetStatus.ACTIVE if activates else counters.status,
+                    version=Bet.version + (1 if activates else 0),
+                )
+                .returning(Bet.entries_count, Bet.distinct_option_count, Bet.status, Bet.version)
+                .execution_options(synchronize_session=False)
             )
-        )
-    else:
-        raise BetClosedForEntry()
-
-    await _notify_new_participant(
+        ).one()
+    set_committed_value(option, "entry_count", option_count)
+    activated = counters.version != bet.version
+    set_committed_value(bet, "entries_count", counters.entries_count)
+    set_committed_value(bet, "distinct_option_count", counters.distinct_option_count)
+    set_committed_value(bet, "status", counters.status)
+    set_committed_value(bet, "version", counters.version)
+
+    _notify_new_participant(
         db, bet.id, bet.circle_id, bet.title, user.id, user.display_name
     )
+    await _touch_circle(db, bet.circle_id)
+    if activated and bet.is_time_limited:
+        # Active bets are resolved by their creator, not closed at the deadline
+        await _publish_deadlines(db, [(bet.id, None)])
     await db.commit()
-    await db.refresh(bet)
-    result = await db.execute(select(Bet).options(selectinload(Bet.options)).where(Bet.id == bet.id))
-    bet = result.scalar_one()
-    return await _bet_to_response(db, bet, user.id)
+    return _build_bet_response(
+        bet,
+        BetEntryResponse(
+            id=inserted.id,
+            user_id=user.id,
+            option_id=req.option_id,
+            is_double_down=req.is_double_down,
+            entered_at=inserted.entered_at,
+        ),
+    )
 
 
-async def end_bet(db: AsyncSession, user: User, bet_id: uuid.UUID, req: BetEndRequest) -> BetResponse:
+async def end_bet(
+    db: AsyncSession, user: User, bet_id: uuid.UUID, req: BetEndRequest, expected_version: int | None = None
+) -> BetResponse:
+    """Queries: bet + options, caller's entry, bet compare-and-swap UPDATE, participant row locks,
+    score settlement UPDATE, score_events INSERT, daily_scores, user_scores and user_circle_stats upserts,
+    outbox INSERT, circle version bump."""
     result = await db.execute(
         select(Bet).options(selectinload(Bet.options)).where(Bet.id == bet_id)
     )
@@ -328,46 +657,40 @@ async def end_bet(db: AsyncSession, user: User, bet_id: uuid.UUID, req: BetEndRe
     if bet.status != BetStatus.ACTIVE:
         raise BetCannotEnd()
 
-    entry_count = await db.execute(select(func.count()).select_from(BetEntry).where(BetEntry.bet_id == bet.id))
-    if int(entry_count.scalar_one()) < 2:
+    if bet.entries_count < 2:
         raise BetCannotEnd()
 
     option_ids = {o.id for o in bet.options}
     if req.result_option_id is not None and req.result_option_id not in option_ids:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid result option")
 
-    bet.result_option_id = req.result_option_id
-    bet.status = BetStatus.FINISHED
+    my_entry = await _get_entry(db, bet.id, user.id)
+    # Claim the bet before settling so a concurrent settlement cannot score it twice
+    await _compare_and_swap(
+        db, bet, expected_version, result_option_id=req.result_option_id, status=BetStatus.FINISHED
+    )
 
     if req.result_option_id is not None:
-        entries_result = await db.execute(select(BetEntry).where(BetEntry.bet_id == bet.id))
-        entries = entries_result.scalars().all()
-        win_id = req.result_option_id
-
-        for e in entries:
-            delta = 2 if e.is_double_down else 1
-            cm = await db.get(CircleMember, (e.user_id, bet.circle_id))
-            if not cm:
-                continue
-            if e.option_id == win_id:
-                cm.score += delta
-            else:
-                cm.score -= delta
-
+        await _settle_scores(db, bet.id, bet.circle_id, req.result_option_id)
         result_opt = next((o for o in bet.options if o.id == req.result_option_id), None)
         result_label = result_opt.label if result_opt else "Unknown"
     else:
         result_label = "No result — scores unchanged"
 
-    await _notify_bet_ended(db, bet.id, bet.circle_id, bet.title, result_label)
+    _notify_bet_ended(db, bet.id, bet.circle_id, bet.title, result_label)
+    await _touch_circle(db, bet.circle_id)
     await db.commit()
-    await db.refresh(bet)
-    res = await db.execute(select(Bet).options(selectinload(Bet.options)).where(Bet.id == bet.id))
-    bet = res.scalar_one()
-    return await _bet_to_response(db, bet, user.id)
+    if req.result_option_id is not None:
+        invalidate_leaderboards(bet.circle_id)
+    return _build_bet_response(bet, _entry_to_response(my_entry) if my_entry else None)
 
 
-async def update_bet(db: AsyncSession, user: User, bet_id: uuid.UUID, req: BetUpdate) -> BetResponse:
+async def update_bet(
+    db: AsyncSession, user: User, bet_id: uuid.UUID, req: BetUpdate, expected_version: int | None = None
+) -> BetResponse:
+    """Queries: bet + options, caller's entry, bet compare-and-swap UPDATE, circle version bump; replacing
+    options adds the options INSERT, entry UPDATE, old-options DELETE and two counter recount UPDATEs;
+    changing the time limit adds a deadline NOTIFY."""
     result = await db.execute(
         select(Bet).options(selectinload(Bet.options)).where(Bet.id == bet_id)
     )
@@ -379,20 +702,26 @@ async def update_bet(db: AsyncSession, user: User, bet_id: uuid.UUID, req: BetUp
     if bet.status != BetStatus.PENDING:
         raise BetNotEditable()
 
+    creator_entry = await _get_entry(db, bet.id, user.id)
+    values: dict = {}
     if req.title is not None:
-        bet.title = req.title.strip()
+        values["title"] = req.title.strip()
     if req.description is not None:
-        bet.description = req.description
+        values["description"] = req.description
     if req.image_url is not None:
-        bet.image_url = req.image_url
-    if req.is_time_limited is not None:
-        bet.is_time_limited = req.is_time_limited
-    if req.end_time is not None:
-        bet.end_time = _aware(req.end_time)
-    if bet.is_time_limited and bet.end_time and bet.end_time <= _now_utc():
+        values["image_url"] = req.image_url
+    is_time_limited = bet.is_time_limited if req.is_time_limited is None else req.is_time_limited
+    end_time = bet.end_time if req.end_time is None else _aware(req.end_time)
+    if is_time_limited and end_time and end_time <= _now_utc():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="End time must be in the future")
-    if not bet.is_time_limited:
-        bet.end_time = None
+    if not is_time_limited:
+        end_time = None
+    # Only write (and announce) the deadline when it actually differs from the stored one
+    old_deadline = bet.end_time if bet.is_time_limited else None
+    if is_time_limited != bet.is_time_limited:
+        values["is_time_limited"] = is_time_limited
+    if end_time != bet.end_time:
+        values["end_time"] = end_time
 
     if req.options is not None:
         if len(req.options) < 2 or len(req.options) > 5:
@@ -403,38 +732,50 @@ async def update_bet(db: AsyncSession, user: User, bet_id: uuid.UUID, req: BetUp
         for label in req.options:
             if not label or not str(label).strip():
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Each option must be non-empty")
+        # Other members' picks cannot be carried over to a new set of options
+        own_entries = 1 if creator_entry else 0
+        if bet.entries_count > own_entries:
+            raise BetHasEntries()
+        # Entering does not bump the version, so re-check under the lock for an entry that raced in
+        conditions = [Bet.entries_count == own_entries]
+    else:
+        conditions = []
 
-        await db.execute(delete(BetOption).where(BetOption.bet_id == bet.id))
-        await db.flush()
-        new_options: list[BetOption] = []
-        for i, label in enumerate([x.strip() for x in req.options]):
-            opt = BetOption(bet_id=bet.id, label=label, position=i)
-            db.add(opt)
-            new_options.append(opt)
+    await _compare_and_swap(db, bet, expected_version, *conditions, **values)
+
+    if req.options is not None:
+        new_options = [
+            BetOption(bet_id=bet.id, label=label, position=i)
+            for i, label in enumerate([x.strip() for x in req.options])
+        ]
+        db.add_all(new_options)
         await db.flush()
-        chosen_id = new_options[idx].id
-        ent = await db.execute(
-            select(BetEntry).where(BetEntry.bet_id == bet.id, BetEntry.user_id == user.id)
-        )
-        creator_entry = ent.scalar_one_or_none()
         if creator_entry:
-            creator_entry.option_id = chosen_id
+            creator_entry.option_id = new_options[idx].id
             if req.is_double_down is not None:
                 creator_entry.is_double_down = req.is_double_down
-    elif req.is_double_down is not None:
-        ent = await db.execute(select(BetEntry).where(BetEntry.bet_id == bet.id, BetEntry.user_id == user.id))
-        e = ent.scalar_one_or_none()
-        if e:
-            e.is_double_down = req.is_double_down
-
+        # Remove the old options only after the creator's entry has moved off them
+        await db.execute(
+            delete(BetOption).where(
+                BetOption.bet_id == bet.id, BetOption.id.not_in([o.id for o in new_options])
+            )
+        )
+        set_committed_value(bet, "options", new_options)
+        await _recount_entries(db, bet)
+    elif req.is_double_down is not None and creator_entry:
+        creator_entry.is_double_down = req.is_double_down
+
+    await _touch_circle(db, bet.circle_id)
+    if end_time != old_deadline:
+        await _publish_deadlines(db, [(bet.id, bet.end_time if bet.is_time_limited else None)])
     await db.commit()
-    await db.refresh(bet)
-    result = await db.execute(select(Bet).options(selectinload(Bet.options)).where(Bet.id == bet.id))
-    bet = result.scalar_one()
-    return await _bet_to_response(db, bet, user.id)
+    return _build_bet_response(bet, _entry_to_response(creator_entry) if creator_entry else None)
 
 
-async def update_bet_image(db: AsyncSession, user: User, bet_id: uuid.UUID, req: BetImageUpdate) -> BetResponse:
+async def update_bet_image(
+    db: AsyncSession, user: User, bet_id: uuid.UUID, req: BetImageUpdate, expected_version: int | None = None
+) -> BetResponse:
+    """Queries: bet + options, caller's entry, bet compare-and-swap UPDATE, circle version bump."""
     result = await db.execute(select(Bet).options(selectinload(Bet.options)).where(Bet.id == bet_id))
     bet = result.scalar_one_or_none()
     if not bet:
@@ -443,15 +784,14 @@ async def update_bet_image(db: AsyncSession, user: User, bet_id: uuid.UUID, req:
         raise NotBetCreator()
     if bet.status == BetStatus.FINISHED:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot change image on a finished bet")
-    bet.image_url = req.image_url
+    my_entry = await _get_entry(db, bet.id, user.id)
+    await _compare_and_swap(db, bet, expected_version, image_url=req.image_url)
+    await _touch_circle(db, bet.circle_id)
     await db.commit()
-    await db.refresh(bet)
-    result = await db.execute(select(Bet).options(selectinload(Bet.options)).where(Bet.id == bet.id))
-    bet = result.scalar_one()
-    return await _bet_to_response(db, bet, user.id)
+    return _build_bet_response(bet, _entry_to_response(my_entry) if my_entry else None)
 
 
-async def delete_bet(db: AsyncSession, user: User, bet_id: uuid.UUID) -> None:
+async def delete_bet(db: AsyncSession, user: User, bet_id: uuid.UUID, expected_version: int | None = None) -> None:
     result = await db.execute(select(Bet).where(Bet.id == bet_id))
     bet = result.scalar_one_or_none()
     if not bet:
@@ -460,5 +800,61 @@ async def delete_bet(db: AsyncSession, user: User, bet_id: uuid.UUID) -> None:
         raise NotBetCreator()
     if bet.status != BetStatus.PENDING:
         raise BetNotEditable()
-    await db.execute(delete(Bet).where(Bet.id == bet_id))
+    if expected_version is not None and expected_version != bet.version:
+        raise BetVersionConflict()
+    deleted = await db.execute(
+        delete(Bet).where(Bet.id == bet_id, Bet.version == bet.version).returning(Bet.id)
+    )
+    if deleted.scalar_one_or_none() is None:
+        raise BetVersionConflict()
+    await _touch_circle(db, bet.circle_id, bets_added=-1)
+    if bet.is_time_limited:
+        await _publish_deadlines(db, [(bet.id, None)])
+    await db.commit()
+
+
+async def pending_deadlines(db: AsyncSession, before: datetime) -> list[tuple[uuid.UUID, datetime]]:
+    """(id, end_time) of PENDING time-limited bets ending before ``before``, for the expiry heap."""
+    result = await db.execute(
+        select(Bet.id, Bet.end_time).where(
+            Bet.is_time_limited, Bet.status == BetStatus.PENDING, Bet.end_time < before
+        )
+    )
+    return [(bet_id, end_time) for bet_id, end_time in result.all()]
+
+
+async def close_expired_bets(db: AsyncSession, limit: int) -> int:
+    """Close up to ``limit`` PENDING time-limited bets whose end_time has passed; returns how many.
+
+    A pending bet past its deadline can no longer gain entries, so it can never activate or be
+    resolved: it is finished with no result and scores stay unchanged. Expired ACTIVE bets are
+    left for their creator to resolve. Rows locked by a concurrent entry or edit are skipped and
+    picked up by a later sweep. Served by the ix_bets_pending_end_time partial index.
+    """
+    expired = (
+        select(Bet.id)
+        .where(Bet.is_time_limited, Bet.status == BetStatus.PENDING, Bet.end_time <= _now_utc())
+        .order_by(Bet.end_time)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(Bet)
+        .where(Bet.id.in_(expired.scalar_subquery()))
+        .values(status=BetStatus.FINISHED, version=Bet.version + 1)
+        .returning(Bet.id, Bet.circle_id, Bet.title)
+        .execution_options(synchronize_session=False)
+    )
+    closed = result.all()
+    if not closed:
+        return 0
+    for bet_id, circle_id, title in closed:
+        _notify_bet_ended(db, bet_id, circle_id, title, "No result — entries closed before it became active")
+    await db.execute(
+        update(Circle)
+        .where(Circle.id.in_({circle_id for _, circle_id, _ in closed}))
+        .values(bets_version=Circle.bets_version + 1)
+        .execution_options(synchronize_session=False)
+    )
     await db.commit()
+    return len(closed)
@@ -1,16 +1,55 @@
 import uuid
+from collections.abc import AsyncIterator
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from app.models.bet import Bet
+from app.cache import LRUCache
+from app.config import settings
 from app.models.circle import Circle
 from app.models.circle_member import CircleMember
 from app.models.user import User
-from app.schemas.circle import CircleCreate, CircleResponse
+from app.models.user_circle_stats import UserCircleStats
+from app.pagination import decode_cursor, encode_cursor
+from app.schemas.circle import (
+    CircleCreate,
+    CircleMemberPage,
+    CircleMemberResponse,
+    CircleResponse,
+    MemberStatsResponse,
+)
 from app.exceptions import AlreadyMember
+from app.services.leaderboard import invalidate_leaderboards, record_circle_join
+from app.services.membership import (
+    cached_membership,
+    invalidate_membership,
+    is_member,
+    remember_membership,
+    require_member,
+)
+
+# Invite token -> circle id. Tokens never change, so resolved ones need no TTL; unknown tokens are
+# remembered briefly so a flood of bad links does not reach the database.
+invite_cache: LRUCache[str, uuid.UUID] = LRUCache("invite_tokens", settings.INVITE_CACHE_SIZE)
+invalid_invite_cache: LRUCache[str, bool] = LRUCache(
+    "invalid_invite_tokens", settings.INVITE_CACHE_SIZE, settings.INVITE_NEGATIVE_CACHE_TTL_SECONDS
+)
+
+
+def _build_circle_response(circle: Circle) -> CircleResponse:
+    return CircleResponse(
+        id=circle.id,
+        name=circle.name,
+        description=circle.description,
+        icon_url=circle.icon_url,
+        invite_token=circle.invite_token,
+        creator_id=circle.creator_id,
+        member_count=circle.member_count,
+        bet_count=circle.bet_count,
+        created_at=circle.created_at,
+    )
 
 
 async def create_circle(db: AsyncSession, user: User, req: CircleCreate) -> CircleResponse:
@@ -20,6 +59,7 @@ async def create_circle(db: AsyncSession, user: User, req: CircleCreate) -> Circ
         icon_url=req.icon_url,
         invite_token=uuid.uuid4().hex,
         creator_id=user.id,
+        member_count=1,
     )
     db.add(circle)
     await db.flush()
@@ -30,126 +70,77 @@ async def create_circle(db: AsyncSession, user: User, req: CircleCreate) -> Circ
         score=0,
     )
     db.add(member)
+    await record_circle_join(db, user.id)
     await db.commit()
     await db.refresh(circle)
 
-    return CircleResponse(
-        id=circle.id,
-        name=circle.name,
-        description=circle.description,
-        icon_url=circle.icon_url,
-        invite_token=circle.invite_token,
-        creator_id=circle.creator_id,
-        member_count=1,
-        bet_count=0,
-        created_at=circle.created_at,
-    )
+    return _build_circle_response(circle)
 
 
 async def get_user_circles(db: AsyncSession, user: User) -> list[CircleResponse]:
-    stmt = (
-        select(
-            Circle,
-            func.count(CircleMember.user_id.distinct()).label("member_count"),
-            func.count(Bet.id.distinct()).label("bet_count"),
-        )
-        .join(CircleMember, Circle.id == CircleMember.circle_id)
-        .outerjoin(Bet, Circle.id == Bet.circle_id)
-        .where(
-            Circle.id.in_(
-                select(CircleMember.circle_id).where(CircleMember.user_id == user.id)
-            )
-        )
-        .group_by(Circle.id)
+    """Queries: one circles read through the caller's circle_members rows; counts are stored on circles."""
+    result = await db.execute(
+        select(Circle).join(CircleMember, Circle.id == CircleMember.circle_id).where(CircleMember.user_id == user.id)
     )
-    result = await db.execute(stmt)
-    return [
-        CircleResponse(
-            id=circle.id,
-            name=circle.name,
-            description=circle.description,
-            icon_url=circle.icon_url,
-            invite_token=circle.invite_token,
-            creator_id=circle.creator_id,
-            member_count=member_count,
-            bet_count=bet_count,
-            created_at=circle.created_at,
-        )
-        for circle, member_count, bet_count in result.all()
-    ]
+    return [_build_circle_response(circle) for circle in result.scalars()]
 
 
 async def get_circle(db: AsyncSession, circle_id: uuid.UUID, user: User) -> CircleResponse:
     circle = await db.get(Circle, circle_id)
     if not circle:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Circle not found")
+    return _build_circle_response(circle)
 
-    counts_result = await db.execute(
-        select(
-            func.count(CircleMember.user_id.distinct()).label("member_count"),
-            func.count(Bet.id.distinct()).label("bet_count"),
-        )
-        .select_from(Circle)
-        .outerjoin(CircleMember, CircleMember.circle_id == circle_id)
-        .outerjoin(Bet, Bet.circle_id == circle_id)
-        .where(Circle.id == circle_id)
-    )
-    row = counts_result.one()
 
-    return CircleResponse(
-        id=circle.id,
-        name=circle.name,
-        description=circle.description,
-        icon_url=circle.icon_url,
-        invite_token=circle.invite_token,
-        creator_id=circle.creator_id,
-        member_count=row.member_count,
-        bet_count=row.bet_count,
-        created_at=circle.created_at,
-    )
+async def _resolve_invite(db: AsyncSession, invite_token: str) -> uuid.UUID:
+    """Queries: none when the token is cached either way, otherwise one circles read by invite_token."""
+    circle_id = invite_cache.get(invite_token)
+    if circle_id is not None:
+        return circle_id
+    if invalid_invite_cache.get(invite_token):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid invite link")
+    circle_id = (await db.execute(select(Circle.id).where(Circle.invite_token == invite_token))).scalar_one_or_none()
+    if circle_id is None:
+        invalid_invite_cache.set(invite_token, True)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid invite link")
+    invite_cache.set(invite_token, circle_id)
+    return circle_id
 
 
 async def join_circle(db: AsyncSession, user: User, invite_token: str) -> CircleResponse:
-    result = await db.execute(select(Circle).where(Circle.invite_token == invite_token))
-    circle = result.scalar_one_or_none()
-    if not circle:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid invite link")
-
-    existing = await db.get(CircleMember, (user.id, circle.id))
-    if existing:
+    """Queries: invite token lookup (none when cached), membership INSERT ... ON CONFLICT DO NOTHING
+    RETURNING, circle member_count UPDATE ... RETURNING the circle, user_scores upsert."""
+    circle_id = await _resolve_invite(db, invite_token)
+    if cached_membership(db, user.id, circle_id):
         raise AlreadyMember()
 
-    member = CircleMember(
-        user_id=user.id,
-        circle_id=circle.id,
-        score=0,
+    # The (user_id, circle_id) primary key arbitrates repeated and concurrent joins by the same user
+    inserted = await db.execute(
+        pg_insert(CircleMember)
+        .values(user_id=user.id, circle_id=circle_id, score=0)
+        .on_conflict_do_nothing(index_elements=[CircleMember.user_id, CircleMember.circle_id])
+        .returning(CircleMember.user_id)
     )
-    db.add(member)
-    await db.commit()
+    if inserted.scalar_one_or_none() is None:
+        remember_membership(db, user.id, circle_id, True)
+        raise AlreadyMember()
 
-    counts_result = await db.execute(
-        select(
-            func.count(CircleMember.user_id.distinct()).label("member_count"),
-            func.count(Bet.id.distinct()).label("bet_count"),
+    # Incremented in the database so concurrent joins cannot lose a count; RETURNING supplies the response
+    circle = (
+        await db.execute(
+            update(Circle)
+            .where(Circle.id == circle_id)
+            .values(member_count=Circle.member_count + 1)
+            .returning(Circle)
+            .execution_options(synchronize_session=False)
         )
-        .select_from(Circle)
-        .outerjoin(CircleMember, CircleMember.circle_id == circle.id)
-        .outerjoin(Bet, Bet.circle_id == circle.id)
-        .where(Circle.id == circle.id)
-    )
-    row = counts_result.one()
+    ).scalar_one()
+    await record_circle_join(db, user.id)
+    await db.commit()
+    invalidate_leaderboards(circle_id)
+    invalidate_membership(db, user.id, circle_id)
 
-    return CircleResponse(
-        id=circle.id,
-        name=circle.name,
-        description=circle.description,
-        icon_url=circle.icon_url,
-        invite_token=circle.invite_token,
-        creator_id=circle.creator_id,
-        member_count=row.member_count,
-        bet_count=row.bet_count,
-        created_at=circle.created_at,
-    )
+    return _build_circle_response(circle)
 
 
 async def update_circle_icon(
@@ -165,35 +156,77 @@ async def update_circle_icon(
     await db.commit()
     await db.refresh(circle)
 
-    counts_result = await db.execute(
-        select(
-            func.count(CircleMember.user_id.distinct()).label("member_count"),
-            func.count(Bet.id.distinct()).label("bet_count"),
-        )
-        .select_from(Circle)
-        .outerjoin(CircleMember, CircleMember.circle_id == circle_id)
-        .outerjoin(Bet, Bet.circle_id == circle_id)
-        .where(Circle.id == circle_id)
-    )
-    row = counts_result.one()
+    return _build_circle_response(circle)
 
-    return CircleResponse(
-        id=circle.id,
-        name=circle.name,
-        description=circle.description,
-        icon_url=circle.icon_url,
-        invite_token=circle.invite_token,
-        creator_id=circle.creator_id,
-        member_count=row.member_count,
-        bet_count=row.bet_count,
-        created_at=circle.created_at,
+
+def _members_query(circle_id: uuid.UUID, cursor: str | None):
+    """Only the columns CircleMemberResponse needs, in (joined_at, user_id) order after the cursor."""
+    stmt = (
+        select(CircleMember.user_id, User.display_name, CircleMember.score, CircleMember.joined_at)
+        .join(User, User.id == CircleMember.user_id)
+        .where(CircleMember.circle_id == circle_id)
+    )
+    if cursor:
+        stmt = stmt.where(tuple_(CircleMember.joined_at, CircleMember.user_id) > decode_cursor(cursor))
+    return stmt.order_by(CircleMember.joined_at, CircleMember.user_id)
+
+
+async def get_circle_members(
+    db: AsyncSession, circle_id: uuid.UUID, limit: int = 100, cursor: str | None = None
+) -> CircleMemberPage:
+    """Queries: one keyset page over ix_circle_members_circle_id_joined_at joined to users."""
+    # Fetch one extra row to learn whether another page exists
+    result = await db.execute(_members_query(circle_id, cursor).limit(limit + 1))
+    rows = result.all()
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(rows[limit - 1].joined_at, rows[limit - 1].user_id)
+    return CircleMemberPage(
+        items=[CircleMemberResponse.model_validate(row, from_attributes=True) for row in rows[:limit]],
+        next_cursor=next_cursor,
     )
 
 
-async def get_circle_members(db: AsyncSession, circle_id: uuid.UUID) -> list[CircleMember]:
-    result = await db.execute(
-        select(CircleMember)
-        .options(selectinload(CircleMember.user))
-        .where(CircleMember.circle_id == circle_id)
+def stream_circle_members(db: AsyncSession, circle_id: uuid.UUID, cursor: str | None = None) -> AsyncIterator[str]:
+    """Every member after ``cursor`` as NDJSON lines, read from a server-side cursor in fixed-size batches
+    so memory stays constant however large the circle is.
+
+    The cursor is decoded here rather than in the generator, so a bad one fails before streaming starts.
+    """
+    stmt = _members_query(circle_id, cursor).execution_options(yield_per=settings.MEMBER_STREAM_BATCH_SIZE)
+
+    async def lines() -> AsyncIterator[str]:
+        result = await db.stream(stmt)
+        async for rows in result.partitions():
+            yield "".join(
+                CircleMemberResponse.model_validate(row, from_attributes=True).model_dump_json() + "\n"
+                for row in rows
+            )
+
+    return lines()
+
+
+async def get_member_stats(
+    db: AsyncSession, user: User, circle_id: uuid.UUID, user_id: uuid.UUID
+) -> MemberStatsResponse:
+    """Queries: caller's membership check (none when cached), user_circle_stats primary-key lookup; plus
+    the member's membership check when there is no stats row. Members with no settled bets get zeroed stats."""
+    await require_member(db, user.id, circle_id)
+    stats = await db.get(UserCircleStats, (circle_id, user_id))
+    if stats is None:
+        if not await is_member(db, user_id, circle_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found")
+        return MemberStatsResponse(user_id=user_id, circle_id=circle_id)
+    settled = stats.bets_won + stats.bets_lost
+    return MemberStatsResponse(
+        user_id=user_id,
+        circle_id=circle_id,
+        bets_won=stats.bets_won,
+        bets_lost=stats.bets_lost,
+        win_rate=stats.bets_won / settled if settled else None,
+        current_streak=stats.current_streak,
+        best_win_streak=stats.best_win_streak,
+        double_downs=stats.double_downs,
+        double_downs_won=stats.double_downs_won,
+        double_down_success_rate=stats.double_downs_won / stats.double_downs if stats.double_downs else None,
     )
-    return list(result.scalars().all())
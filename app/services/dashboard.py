@@ -0,0 +1,33 @@
+import uuid
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.user import User
+from app.schemas.circle import CircleDashboardResponse
+from app.services.bet import get_circle_bets
+from app.services.circle import get_circle, get_circle_members
+from app.services.leaderboard import get_circle_leaderboard
+from app.services.membership import require_member
+from app.services.notification import get_unread_count
+
+
+async def get_circle_dashboard(db: AsyncSession, user: User, circle_id: uuid.UUID) -> CircleDashboardResponse:
+    """The circle page's five reads in one request and one session.
+
+    A session runs one statement at a time, so the sections are loaded in turn; they share
+    the membership check (memoized in the session) and the leaderboard and bet list caches.
+    Queries: membership check (none when cached), circle get, leaderboard (none when cached),
+    one members page, bets_version read plus the bet page (none when cached) and the caller's
+    entries, unread count.
+    """
+    await require_member(db, user.id, circle_id)
+    preview = settings.DASHBOARD_PREVIEW_SIZE
+    circle = await get_circle(db, circle_id, user)
+    leaderboard = await get_circle_leaderboard(db, circle_id, limit=preview, around_user_id=user.id)
+    members = await get_circle_members(db, circle_id, limit=preview)
+    bets = await get_circle_bets(db, user, circle_id, limit=preview)
+    unread_count = await get_unread_count(db, user)
+    return CircleDashboardResponse(
+        circle=circle, leaderboard=leaderboard, members=members, bets=bets, unread_count=unread_count
+    )
@@ -1,30 +1,275 @@
 import uuid
+from datetime import date, datetime, timedelta, timezone
 
-from sqlalchemy import select
+from sqlalchemy import false, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
+from app.cache import LRUCache
+from app.config import settings
+from app.models.bet import Bet, BetStatus
+from app.models.bet_entry import BetEntry
 from app.models.circle_member import CircleMember
-from app.schemas.leaderboard import LeaderboardEntry
+from app.models.daily_score import DailyScore
+from app.models.user import User
+from app.models.user_score import UserScore
+from app.schemas.leaderboard import GlobalLeaderboardEntry, LeaderboardEntry
+
+WINDOWS = ("all", "week", "month", "season")
+
+Ranked = list[tuple[int, LeaderboardEntry]]
+# Slices of one circle's standings in one window: ("page", limit, offset), shared by everyone
+# reading that page, and ("around", user_id, radius), one member's neighbourhood. Each holds the
+# window's start day and at most limit or 2 * radius + 1 rows, tagged with their position.
+Slices = dict[tuple, tuple[date | None, Ranked]]
+
+# Keyed by (circle_id, window), so however many members view a busy circle it takes one entry
+# and cannot evict other circles; each entry keeps at most LEADERBOARD_SLICES_PER_CIRCLE
+# slices, dropping the oldest. Scores only change when a bet is settled and membership only on
+# join, so end_bet and join_circle drop their circle's entries after commit; the TTL bounds
+# how long other worker processes can serve standings from before such a change.
+leaderboard_cache: LRUCache[tuple[uuid.UUID, str], Slices] = LRUCache(
+    "leaderboards", settings.LEADERBOARD_CACHE_SIZE, settings.LEADERBOARD_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_leaderboards(circle_id: uuid.UUID) -> None:
+    for window in WINDOWS:
+        leaderboard_cache.invalidate((circle_id, window))
+
+
+def _remember(slices: Slices, key: tuple, value: tuple[date | None, Ranked]) -> None:
+    slices.pop(key, None)
+    slices[key] = value
+    while len(slices) > settings.LEADERBOARD_SLICES_PER_CIRCLE:
+        del slices[next(iter(slices))]
+
+
+def _window_start(window: str, today: date) -> date | None:
+    """First UTC day counted by a window: ISO week, calendar month, or calendar quarter (season)."""
+    if window == "week":
+        return today - timedelta(days=today.weekday())
+    if window == "month":
+        return today.replace(day=1)
+    if window == "season":
+        return today.replace(month=3 * ((today.month - 1) // 3) + 1, day=1)
+    return None
+
+
+async def _load_ranked(
+    db: AsyncSession,
+    circle_id: uuid.UUID,
+    start: date | None,
+    page: tuple[int, int] | None,
+    around: tuple[uuid.UUID, int] | None,
+) -> tuple[Ranked, Ranked]:
+    """Rank the circle in SQL and return only the requested rows: the ``page`` (limit, offset)
+    and the ``around`` (user_id, radius) window, as (page rows, window rows).
+
+    All-time ranks come off ix_circle_members_circle_id_score; a window sums daily_scores from
+    ``start`` (a range scan of its primary key). Ties share a rank (RANK(), so 1, 1, 3) and are
+    listed by user_id, so pages are stable. Only the returned rows are joined to users.
+    """
+    if start is None:
+        score = CircleMember.score
+        members = select(CircleMember.user_id)
+    else:
+        window_scores = (
+            select(DailyScore.user_id, func.sum(DailyScore.delta).label("score"))
+            .where(DailyScore.circle_id == circle_id, DailyScore.day >= start)
+            .group_by(DailyScore.user_id)
+            .subquery()
+        )
+        score = func.coalesce(window_scores.c.score, 0)
+        members = select(CircleMember.user_id).outerjoin(
+            window_scores, window_scores.c.user_id == CircleMember.user_id
+        )
+    ranked = (
+        members.add_columns(
+            score.label("score"),
+            func.rank().over(order_by=score.desc()).label("rank"),
+            func.row_number().over(order_by=(score.desc(), CircleMember.user_id)).label("pos"),
+        )
+        .where(CircleMember.circle_id == circle_id)
+        .cte("ranked")
+    )
+    in_page = ranked.c.pos.between(page[1] + 1, page[1] + page[0]) if page else false()
+    if around:
+        my_pos = select(ranked.c.pos).where(ranked.c.user_id == around[0]).scalar_subquery()
+        in_window = ranked.c.pos.between(my_pos - around[1], my_pos + around[1])
+    else:
+        in_window = false()
+    result = await db.execute(
+        select(
+            ranked.c.pos,
+            ranked.c.rank,
+            ranked.c.user_id,
+            User.display_name,
+            ranked.c.score,
+            in_page.label("in_page"),
+            in_window.label("in_window"),
+        )
+        .join(User, User.id == ranked.c.user_id)
+        .where(in_page | in_window)
+        .order_by(ranked.c.pos)
+    )
+    page_rows: Ranked = []
+    window_rows: Ranked = []
+    for row in result.all():
+        entry = LeaderboardEntry(rank=row.rank, user_id=row.user_id, display_name=row.display_name, score=row.score)
+        if row.in_page:
+            page_rows.append((row.pos, entry))
+        if row.in_window:
+            window_rows.append((row.pos, entry))
+    return page_rows, window_rows
 
 
 async def get_circle_leaderboard(
-    db: AsyncSession, circle_id: uuid.UUID
+    db: AsyncSession,
+    circle_id: uuid.UUID,
+    limit: int = 50,
+    offset: int = 0,
+    around_user_id: uuid.UUID | None = None,
+    radius: int = 2,
+    window: str = "all",
 ) -> list[LeaderboardEntry]:
+    """One page of the circle's standings, served from leaderboard_cache between settlements.
+
+    ``window`` ranks by points won this week, month or season instead of all-time score.
+    With ``around_user_id`` the page is followed by that member and ``radius`` neighbours on
+    each side; a jump in rank marks where the two parts meet. Whatever is not cached is
+    fetched in one bounded query.
+    """
+    if window not in WINDOWS:
+        window = "all"
+    start = _window_start(window, datetime.now(timezone.utc).date())
+
+    cache_key = (circle_id, window)
+    slices = leaderboard_cache.get(cache_key)
+    if slices is None:
+        slices = {}
+        leaderboard_cache.set(cache_key, slices)
+
+    def cached(key: tuple) -> Ranked | None:
+        hit = slices.get(key)
+        return hit[1] if hit is not None and hit[0] == start else None
+
+    page_key = ("page", limit, offset)
+    around_key = ("around", around_user_id, radius)
+    page_rows = cached(page_key)
+    window_rows = cached(around_key) if around_user_id is not None else []
+    if page_rows is None or window_rows is None:
+        loaded_page, loaded_window = await _load_ranked(
+            db,
+            circle_id,
+            start,
+            (limit, offset) if page_rows is None else None,
+            (around_user_id, radius) if window_rows is None else None,
+        )
+        # The slices dict doubles as the circle's cache generation: an invalidation while the
+        # query ran replaced it, and rows read before that invalidation must not be stored
+        current = leaderboard_cache.peek(cache_key) is slices
+        if page_rows is None:
+            page_rows = loaded_page
+            if current:
+                _remember(slices, page_key, (start, page_rows))
+        if window_rows is None:
+            window_rows = loaded_window
+            if current:
+                _remember(slices, around_key, (start, window_rows))
+
+    return [entry for _, entry in sorted(dict(page_rows + window_rows).items())]
+
+
+async def get_global_leaderboard(db: AsyncSession, limit: int = 50, offset: int = 0) -> list[GlobalLeaderboardEntry]:
+    """One page of the cross-circle ranking, read off ix_user_scores_total_score.
+
+    Ties share a rank and are listed by user_id, as in circle leaderboards.
+    """
+    ranked = (
+        select(
+            UserScore,
+            func.rank().over(order_by=UserScore.total_score.desc()).label("rank"),
+        )
+        .order_by(UserScore.total_score.desc(), UserScore.user_id)
+        .limit(limit)
+        .offset(offset)
+        .subquery()
+    )
     result = await db.execute(
-        select(CircleMember)
-        .options(selectinload(CircleMember.user))
-        .where(CircleMember.circle_id == circle_id)
-        .order_by(CircleMember.score.desc())
+        select(ranked, User.display_name).join(User, User.id == ranked.c.user_id).order_by(
+            ranked.c.total_score.desc(), ranked.c.user_id
+        )
     )
-    members = result.scalars().all()
-
     return [
-        LeaderboardEntry(
-            rank=i + 1,
-            user_id=m.user_id,
-            display_name=m.user.display_name,
-            score=m.score,
+        GlobalLeaderboardEntry(
+            rank=row.rank,
+            user_id=row.user_id,
+            display_name=row.display_name,
+            total_score=row.total_score,
+            circles_count=row.circles_count,
+            bets_won=row.bets_won,
+            bets_lost=row.bets_lost,
         )
-        for i, m in enumerate(members)
+        for row in result.all()
     ]
+
+
+async def record_circle_join(db: AsyncSession, user_id: uuid.UUID) -> None:
+    """Count a new membership in the user's global totals."""
+    stmt = pg_insert(UserScore).values(user_id=user_id, circles_count=1)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserScore.user_id],
+            set_={"circles_count": UserScore.circles_count + 1, "updated_at": func.now()},
+        )
+    )
+
+
+async def repair_user_scores(db: AsyncSession) -> int:
+    """Rebuild user_scores rows that disagree with circle_members and settled entries.
+
+    One INSERT ... SELECT ... ON CONFLICT DO UPDATE whose WHERE only touches drifted rows;
+    returns how many were inserted or repaired. Run it under REPEATABLE READ so a
+    settlement committing mid-statement fails it instead of being overwritten.
+    """
+    memberships = (
+        select(
+            CircleMember.user_id,
+            func.sum(CircleMember.score).label("total_score"),
+            func.count().label("circles_count"),
+        )
+        .group_by(CircleMember.user_id)
+        .subquery()
+    )
+    outcomes = (
+        select(
+            BetEntry.user_id,
+            func.count().filter(BetEntry.option_id == Bet.result_option_id).label("won"),
+            func.count().filter(BetEntry.option_id != Bet.result_option_id).label("lost"),
+        )
+        .join(Bet, Bet.id == BetEntry.bet_id)
+        .where(Bet.status == BetStatus.FINISHED, Bet.result_option_id.is_not(None))
+        .group_by(BetEntry.user_id)
+        .subquery()
+    )
+    truth = select(
+        memberships.c.user_id,
+        memberships.c.total_score,
+        memberships.c.circles_count,
+        func.coalesce(outcomes.c.won, 0),
+        func.coalesce(outcomes.c.lost, 0),
+    ).outerjoin(outcomes, outcomes.c.user_id == memberships.c.user_id)
+
+    stmt = pg_insert(UserScore).from_select(
+        ["user_id", "total_score", "circles_count", "bets_won", "bets_lost"], truth
+    )
+    fields = ("total_score", "circles_count", "bets_won", "bets_lost")
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserScore.user_id],
+            set_={**{f: stmt.excluded[f] for f in fields}, "updated_at": func.now()},
+            where=or_(*(getattr(UserScore, f) != stmt.excluded[f] for f in fields)),
+        ).returning(UserScore.user_id)
+    )
+    return len(result.all())
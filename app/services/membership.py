@@ -0,0 +1,80 @@
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import LRUCache
+from app.config import settings
+from app.exceptions import NotCircleMember
+from app.models.circle_member import CircleMember
+
+MembershipKey = tuple[uuid.UUID, uuid.UUID]
+
+# Process-wide membership facts keyed by (user_id, circle_id). Joins handled by another
+# process only become visible here once a cached non-membership expires, so negative facts
+# get the much shorter TTL; positive facts can only go stale through a leave or kick.
+member_cache: LRUCache[MembershipKey, bool] = LRUCache(
+    "memberships", settings.MEMBERSHIP_CACHE_SIZE, settings.MEMBERSHIP_CACHE_TTL_SECONDS
+)
+non_member_cache: LRUCache[MembershipKey, bool] = LRUCache(
+    "non_memberships", settings.MEMBERSHIP_CACHE_SIZE, settings.MEMBERSHIP_NEGATIVE_CACHE_TTL_SECONDS
+)
+
+# Key in AsyncSession.info of the request's memo; get_db opens one session per request
+_MEMO_KEY = "memberships"
+
+
+def _memo(db: AsyncSession) -> dict[MembershipKey, bool]:
+    return db.info.setdefault(_MEMO_KEY, {})
+
+
+def cached_membership(db: AsyncSession, user_id: uuid.UUID, circle_id: uuid.UUID) -> bool | None:
+    """Membership from the request memo or the process caches, or None if it has to be queried."""
+    key = (user_id, circle_id)
+    memo = _memo(db)
+    if key in memo:
+        return memo[key]
+    if member_cache.get(key):
+        known = True
+    elif non_member_cache.get(key):
+        known = False
+    else:
+        return None
+    memo[key] = known
+    return known
+
+
+def remember_membership(db: AsyncSession, user_id: uuid.UUID, circle_id: uuid.UUID, is_member: bool) -> None:
+    key = (user_id, circle_id)
+    _memo(db)[key] = is_member
+    if is_member:
+        non_member_cache.invalidate(key)
+        member_cache.set(key, True)
+    else:
+        member_cache.invalidate(key)
+        non_member_cache.set(key, True)
+
+
+def invalidate_membership(db: AsyncSession, user_id: uuid.UUID, circle_id: uuid.UUID) -> None:
+    """Forget what is known about one membership; call after committing a join, leave or kick."""
+    key = (user_id, circle_id)
+    _memo(db).pop(key, None)
+    member_cache.invalidate(key)
+    non_member_cache.invalidate(key)
+
+
+async def is_member(db: AsyncSession, user_id: uuid.UUID, circle_id: uuid.UUID) -> bool:
+    """Queries: none when the fact is memoized or cached, otherwise one circle_members primary-key read."""
+    known = cached_membership(db, user_id, circle_id)
+    if known is None:
+        result = await db.execute(
+            select(CircleMember.user_id).where(CircleMember.user_id == user_id, CircleMember.circle_id == circle_id)
+        )
+        known = result.scalar_one_or_none() is not None
+        remember_membership(db, user_id, circle_id, known)
+    return known
+
+
+async def require_member(db: AsyncSession, user_id: uuid.UUID, circle_id: uuid.UUID) -> None:
+    if not await is_member(db, user_id, circle_id):
+        raise NotCircleMember()
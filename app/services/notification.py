@@ -1,9 +1,13 @@
 import uuid
 
-from sqlalchemy import func, select, update
+from sqlalchemy import Select, false, func, literal, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import insert_from_select
+from app.models.bet_entry import BetEntry
+from app.models.circle_member import CircleMember
 from app.models.notification import Notification, NotificationType
+from app.models.notification_event import NotificationEvent
 from app.models.user import User
 from app.schemas.notification import NotificationResponse
 
@@ -47,6 +51,62 @@ async def mark_all_read(db: AsyncSession, user: User) -> None:
     await db.commit()
 
 
+def enqueue_event(
+    db: AsyncSession,
+    type_: NotificationType,
+    title: str,
+    message: str,
+    bet_id: uuid.UUID | None,
+    circle_id: uuid.UUID | None,
+    actor_id: uuid.UUID | None = None,
+) -> None:
+    """Record a single outbox row in the caller's transaction; the outbox worker fans it out later.
+
+    Recipients are resolved at delivery time, not here: a member who joins (or an entrant who
+    enters) before the worker expands the event is notified too.
+    """
+    db.add(
+        NotificationEvent(
+            type=type_,
+            title=title,
+            message=message,
+            bet_id=bet_id,
+            circle_id=circle_id,
+            actor_id=actor_id,
+        )
+    )
+
+
+def _recipients(event: NotificationEvent) -> Select:
+    """The event's recipients as of now: the circle's members for BET_CREATED, otherwise the bet's entrants."""
+    if event.type == NotificationType.BET_CREATED:
+        stmt = select(CircleMember.user_id).where(CircleMember.circle_id == event.circle_id)
+        if event.actor_id is not None:
+            stmt = stmt.where(CircleMember.user_id != event.actor_id)
+    else:
+        stmt = select(BetEntry.user_id).where(BetEntry.bet_id == event.bet_id)
+        if event.actor_id is not None:
+            stmt = stmt.where(BetEntry.user_id != event.actor_id)
+    return stmt
+
+
+async def expand_event(db: AsyncSession, event: NotificationEvent) -> None:
+    """Insert one notification per recipient of ``event`` as a single INSERT ... SELECT."""
+    rows = _recipients(event).add_columns(
+        literal(event.type, Notification.type.type),
+        literal(event.title, Notification.title.type),
+        literal(event.message, Notification.message.type),
+        literal(event.bet_id, Notification.bet_id.type),
+        literal(event.circle_id, Notification.circle_id.type),
+        false(),
+    )
+    await db.execute(
+        insert_from_select(
+            Notification, ["user_id", "type", "title", "message", "bet_id", "circle_id", "is_read"], rows
+        )
+    )
+
+
 def _to_response(n: Notification) -> NotificationResponse:
     return NotificationResponse(
         id=n.id,
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.deadlines import DEADLINES_CHANNEL, DeadlineHeap, bet_deadlines, parse_deadlines
+from app.services.bet import close_expired_bets, pending_deadlines
+
+logger = logging.getLogger(__name__)
+
+
+async def sweep_expired_bets(
+    session_factory: async_sessionmaker[AsyncSession] = async_session,
+    batch_size: int | None = None,
+) -> int:
+    """Close expired bets one bounded batch (and transaction) at a time; returns how many were closed."""
+    batch_size = batch_size or settings.BET_EXPIRY_BATCH_SIZE
+    total = 0
+    while True:
+        async with session_factory() as db:
+            n = await close_expired_bets(db, batch_size)
+        total += n
+        if n < batch_size:
+            return total
+
+
+async def reconcile_deadlines(
+    session_factory: async_sessionmaker[AsyncSession] = async_session,
+    deadlines: DeadlineHeap = bet_deadlines,
+) -> int:
+    """Sweep anything already expired, then (re)load deadlines due before the next reconciliation.
+
+    Catches bets created or edited by other processes and deadlines missed while a row was
+    locked. Returns the number of bets closed.
+    """
+    closed = await sweep_expired_bets(session_factory)
+    horizon = datetime.now(timezone.utc) + timedelta(seconds=2 * settings.BET_EXPIRY_CHECK_INTERVAL_SECONDS)
+    async with session_factory() as db:
+        for bet_id, end_time in await pending_deadlines(db, horizon):
+            deadlines.schedule(bet_id, end_time)
+    return closed
+
+
+async def run_expiry_worker(
+    session_factory: async_sessionmaker[AsyncSession] = async_session,
+    deadlines: DeadlineHeap = bet_deadlines,
+) -> None:
+    """Close bets at their deadline; run as the single "bet-expiry" job from app.main.
+
+    Bet mutations in every process publish deadline changes on DEADLINES_CHANNEL; this
+    worker LISTENs on a dedicated connection, sleeps on the in-memory heap and runs a
+    sweep only when a deadline falls due. A reconciliation every
+    BET_EXPIRY_CHECK_INTERVAL_SECONDS is the fallback for anything missed.
+    """
+
+    def on_deadlines(connection, pid, channel, payload) -> None:
+        for bet_id, deadline in parse_deadlines(payload):
+            deadlines.schedule(bet_id, deadline)
+
+    async with session_factory() as listener:
+        conn = await listener.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.add_listener(DEADLINES_CHANNEL, on_deadlines)
+        try:
+            loop = asyncio.get_running_loop()
+            next_reconcile = loop.time()
+            while True:
+                try:
+                    if loop.time() >= next_reconcile:
+                        next_reconcile = loop.time() + settings.BET_EXPIRY_CHECK_INTERVAL_SECONDS
+                        await reconcile_deadlines(session_factory, deadlines)
+                    elif deadlines.pop_due(datetime.now(timezone.utc)):
+                        await sweep_expired_bets(session_factory)
+                except Exception:
+                    logger.exception("Bet expiry iteration failed")
+                timeout = next_reconcile - loop.time()
+                if (deadline := deadlines.next_deadline()) is not None:
+                    timeout = min(timeout, (deadline - datetime.now(timezone.utc)).total_seconds())
+                await deadlines.wait(timeout)
+        finally:
+            await raw.driver_connection.remove_listener(DEADLINES_CHANNEL, on_deadlines)
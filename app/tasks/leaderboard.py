@@ -0,0 +1,35 @@
+import asyncio
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.services.leaderboard import repair_user_scores
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_user_scores(session_factory: async_sessionmaker[AsyncSession] = async_session) -> int:
+    """Repair drifted global totals in one REPEATABLE READ transaction; returns the rows repaired."""
+    async with session_factory() as db:
+        await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        repaired = await repair_user_scores(db)
+        await db.commit()
+    if repaired:
+        logger.warning("Repaired %d drifted user_scores rows", repaired)
+    return repaired
+
+
+async def run_user_scores_reconciler(session_factory: async_sessionmaker[AsyncSession] = async_session) -> None:
+    """Reconcile every USER_SCORES_RECONCILE_SECONDS; run as a single job from app.main.
+
+    A run that collides with a settlement fails with a serialization error and is simply
+    retried next time.
+    """
+    while True:
+        try:
+            await reconcile_user_scores(session_factory)
+        except Exception:
+            logger.exception("user_scores reconciliation failed")
+        await asyncio.sleep(settings.USER_SCORES_RECONCILE_SECONDS)
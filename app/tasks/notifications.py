@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import async_session
+from app.models.notification_event import NotificationEvent
+from app.services.notification import expand_event
+
+logger = logging.getLogger(__name__)
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(2**attempts, 300))
+
+
+async def process_outbox_batch(
+    session_factory: async_sessionmaker[AsyncSession] = async_session,
+    batch_size: int | None = None,
+) -> int:
+    """Expand up to ``batch_size`` pending outbox events into notifications.
+
+    Events are claimed with FOR UPDATE SKIP LOCKED, so several workers can drain the
+    outbox concurrently. Each event is expanded in its own savepoint and marked
+    processed in the same transaction as its notifications; a failed event is
+    rescheduled with exponential backoff until NOTIFICATION_OUTBOX_MAX_ATTEMPTS.
+    Returns the number of events claimed.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_OUTBOX_BATCH_SIZE
+    async with session_factory() as db:
+        now = datetime.now(timezone.utc)
+        result = await db.execute(
+            select(NotificationEvent)
+            .where(
+                NotificationEvent.processed_at.is_(None),
+                NotificationEvent.available_at <= now,
+                NotificationEvent.attempts < settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS,
+            )
+            .order_by(NotificationEvent.available_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        events = result.scalars().all()
+        for event in events:
+            try:
+                async with db.begin_nested():
+                    await expand_event(db, event)
+                event.processed_at = now
+            except Exception as exc:
+                logger.exception("Failed to expand notification event %s", event.id)
+                event.attempts += 1
+                event.last_error = str(exc)
+                event.available_at = now + _backoff(event.attempts)
+        await db.commit()
+        return len(events)
+
+
+async def drain_outbox(session_factory: async_sessionmaker[AsyncSession] = async_session) -> int:
+    """Process outbox batches until none are pending; returns the number of events claimed."""
+    total = 0
+    while n := await process_outbox_batch(session_factory):
+        total += n
+    return total
+
+
+async def prune_outbox(
+    session_factory: async_sessionmaker[AsyncSession] = async_session,
+    batch_size: int | None = None,
+) -> int:
+    """Delete events processed more than NOTIFICATION_OUTBOX_RETENTION_HOURS ago; returns how many.
+
+    Deletes in batches, each in its own transaction, so locks and WAL stay bounded however far
+    behind pruning is. Pending and dead-lettered events (processed_at IS NULL) are never touched.
+    Served by the ix_notification_events_processed_at partial index.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_OUTBOX_PRUNE_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.NOTIFICATION_OUTBOX_RETENTION_HOURS)
+    total = 0
+    while True:
+        async with session_factory() as db:
+            expired = (
+                select(NotificationEvent.id)
+                .where(NotificationEvent.processed_at < cutoff)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await db.execute(
+                delete(NotificationEvent)
+                .where(NotificationEvent.id.in_(expired.scalar_subquery()))
+                .returning(NotificationEvent.id)
+                .execution_options(synchronize_session=False)
+            )
+            deleted = len(result.all())
+            await db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+async def run_outbox_pruner(session_factory: async_sessionmaker[AsyncSession] = async_session) -> None:
+    """Prune the outbox every NOTIFICATION_OUTBOX_PRUNE_SECONDS; run as a single job from app.main."""
+    while True:
+        try:
+            pruned = await prune_outbox(session_factory)
+            if pruned:
+                logger.info("Pruned %d processed notification events", pruned)
+        except Exception:
+            logger.exception("Notification outbox pruning failed")
+        await asyncio.sleep(settings.NOTIFICATION_OUTBOX_PRUNE_SECONDS)
+
+
+async def run_outbox_worker(session_factory: async_sessionmaker[AsyncSession] = async_session) -> None:
+    """Poll the outbox forever; started from the FastAPI lifespan in app.main."""
+    while True:
+        try:
+            await drain_outbox(session_factory)
+        except Exception:
+            logger.exception("Notification outbox worker iteration failed")
+        await asyncio.sleep(settings.NOTIFICATION_OUTBOX_POLL_SECONDS)
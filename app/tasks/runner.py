@@ -0,0 +1,82 @@
+import asyncio
+import hashlib
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+def job_lock_key(name: str) -> int:
+    """Stable signed 64-bit advisory lock key for a job name."""
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "big", signed=True)
+
+
+class JobRunner:
+    """Runs each named background job in exactly one process across all workers.
+
+    A job is guarded by a session-level Postgres advisory lock keyed by its name, held on
+    a dedicated connection for as long as this process runs it. If the owning process
+    dies its connection closes, Postgres releases the lock and another process takes the
+    job over on its next attempt, within JOB_LEADER_RETRY_SECONDS. A job that raises or
+    returns gives up ownership and is retried the same way.
+    """
+
+    def __init__(
+        self,
+        database_url: str | None = None,
+        retry_seconds: float | None = None,
+        heartbeat_seconds: float | None = None,
+    ):
+        # NullPool: closing a lock connection must really close it, so the lock goes with it
+        self._engine = create_async_engine(database_url or settings.DATABASE_URL, poolclass=NullPool)
+        self._retry_seconds = retry_seconds or settings.JOB_LEADER_RETRY_SECONDS
+        self._heartbeat_seconds = heartbeat_seconds or settings.JOB_LEADER_HEARTBEAT_SECONDS
+        self._jobs: dict[str, Job] = {}
+
+    def add(self, name: str, job: Job) -> None:
+        self._jobs[name] = job
+
+    async def run(self) -> None:
+        """Compete for every registered job until cancelled."""
+        try:
+            await asyncio.gather(*(self._supervise(name, job) for name, job in self._jobs.items()))
+        finally:
+            await self._engine.dispose()
+
+    async def _supervise(self, name: str, job: Job) -> None:
+        key = job_lock_key(name)
+        while True:
+            try:
+                async with self._engine.connect() as conn:
+                    await conn.execution_options(isolation_level="AUTOCOMMIT")
+                    if await conn.scalar(select(func.pg_try_advisory_lock(key))):
+                        logger.info("Acquired job %s", name)
+                        await self._lead(conn, job)
+                        logger.info("Released job %s", name)
+            except Exception:
+                logger.exception("Job %s failed", name)
+            await asyncio.sleep(self._retry_seconds)
+
+    async def _lead(self, conn: AsyncConnection, job: Job) -> None:
+        """Run the job while the lock connection stays healthy; losing it means losing the lock."""
+        task = asyncio.create_task(job())
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self._heartbeat_seconds)
+                if done:
+                    task.result()
+                    return
+                await asyncio.wait_for(conn.execute(select(1)), self._heartbeat_seconds)
+        finally:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
@@ -26,7 +26,13 @@ export default function CirclePage() {
   const [listFilter, setListFilter] = useState<BetListFilter>("all");
   const [statusTab, setStatusTab] = useState<BetStatusFilter>("ALL");
   const statusParam = statusTab === "ALL" ? undefined : statusTab;
-  const { data: bets, isLoading: betsLoading } = useCircleBets(id, listFilter, statusParam);
+  const {
+    data: bets,
+    isLoading: betsLoading,
+    hasNextPage,
+    fetchNextPage,
+    isFetchingNextPage,
+  } = useCircleBets(id, listFilter, statusParam);
   const { data: leaderboard } = useLeaderboard(id);
   const userId = useAuthStore((s) => s.user?.id);
   const updateIcon = useUpdateCircleIcon();
@@ -236,6 +242,18 @@ export default function CirclePage() {
                   />
                 </div>
               ))}
+              {hasNextPage && (
+                <div className="sm:col-span-2 flex justify-center pt-2">
+                  <Button
+                    variant="secondary"
+                    size="sm"
+                    loading={isFetchingNextPage}
+                    onClick={() => fetchNextPage()}
+                  >
+                    Load more
+                  </Button>
+                </div>
+              )}
             </div>
           ) : (
             <div className="text-center py-16 bg-surface border border-border rounded-2xl shadow-sm">
@@ -1,12 +1,13 @@
 "use client";
 
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { useInfiniteQuery, useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { api } from "@/lib/api";
 import type {
   BetCreate,
   BetDetailResponse,
   BetEndRequest,
   BetEntryCreate,
+  BetPage,
   BetResponse,
 } from "@/lib/types";
 
@@ -18,16 +19,20 @@ export function useCircleBets(
   filter: BetListFilter = "all",
   status?: BetStatusFilter
 ) {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: ["bets", "circle", circleId, filter, status ?? "ALL"],
-    queryFn: () => {
+    queryFn: ({ pageParam }) => {
       const qs = new URLSearchParams();
       qs.set("filter", filter);
       if (status && status !== "ALL") qs.set("status", status);
-      return api.get<BetResponse[]>(
+      if (pageParam) qs.set("cursor", pageParam);
+      return api.get<BetPage>(
         `/bets/circle/${circleId}?${qs.toString()}`
       );
     },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
+    select: (data) => data.pages.flatMap((page) => page.items),
     enabled: !!circleId,
   });
 }
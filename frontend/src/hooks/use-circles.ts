@@ -1,11 +1,11 @@
 "use client";
 
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { useInfiniteQuery, useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { api } from "@/lib/api";
 import type {
   CircleResponse,
   CircleCreate,
-  CircleMemberResponse,
+  CircleMemberPage,
 } from "@/lib/types";
 
 export function useCircles() {
@@ -24,10 +24,18 @@ export function useCircle(id: string) {
 }
 
 export function useCircleMembers(circleId: string) {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: ["circles", circleId, "members"],
-    queryFn: () =>
-      api.get<CircleMemberResponse[]>(`/circles/${circleId}/members`),
+    queryFn: ({ pageParam }) => {
+      const qs = new URLSearchParams();
+      if (pageParam) qs.set("cursor", pageParam);
+      return api.get<CircleMemberPage>(
+        `/circles/${circleId}/members?${qs.toString()}`
+      );
+    },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
+    select: (data) => data.pages.flatMap((page) => page.items),
     enabled: !!circleId,
   });
 }
@@ -8,7 +8,7 @@ export function useLeaderboard(circleId: string) {
   return useQuery({
     queryKey: ["circles", circleId, "leaderboard"],
     queryFn: () =>
-      api.get<LeaderboardEntry[]>(`/circles/${circleId}/leaderboard`),
+      api.get<LeaderboardEntry[]>(`/circles/${circleId}/leaderboard?around_me=true`),
     enabled: !!circleId,
   });
 }
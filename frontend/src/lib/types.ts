@@ -30,6 +30,11 @@ export interface CircleMemberResponse {
   joined_at: string;
 }
 
+export interface CircleMemberPage {
+  items: CircleMemberResponse[];
+  next_cursor: string | null;
+}
+
 export interface BetOptionResponse {
   id: string;
   label: string;
@@ -57,10 +62,16 @@ export interface BetResponse {
   options: BetOptionResponse[];
   result_option_id: string | null;
   entries_count: number;
+  version: number;
   created_at: string;
   my_entry: BetEntryResponse | null;
 }
 
+export interface BetPage {
+  items: BetResponse[];
+  next_cursor: string | null;
+}
+
 export interface BetDetailResponse extends BetResponse {
   option_counts: Record<string, number>;
 }
@@ -103,6 +114,16 @@ export interface LeaderboardEntry {
   score: number;
 }
 
+export interface GlobalLeaderboardEntry {
+  rank: number;
+  user_id: string;
+  display_name: string;
+  total_score: number;
+  circles_count: number;
+  bets_won: number;
+  bets_lost: number;
+}
+
 export interface RegisterRequest {
   email: string;
   password: string;
@@ -0,0 +1,135 @@
+"""
+Rebuild user_circle_stats from every settled bet.
+
+Streams settled entries with a server-side cursor, ordered per member by settlement
+time, folds them into win/loss counts, streaks and double-down results, and upserts
+the rows in batches. Rows are overwritten, so the command can be re-run; run it once
+after migration 017, before traffic settles new bets (a bet settled while it runs may
+be overwritten by an older snapshot and needs a re-run).
+
+Settlement time is the bet's score_events timestamp; bets settled before the score
+ledger existed fall back to their end_time, then created_at.
+
+Usage (from repo root):
+  uv run python scripts/backfill_user_circle_stats.py
+  # or: PYTHONPATH=. python3 scripts/backfill_user_circle_stats.py
+
+Optional:
+  BATCH_SIZE=<n>   — rows per fetch and per upsert (default: 1000)
+
+Requires DATABASE_URL (see app/config.py default for local Postgres).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.database import async_session
+from app.models.bet import Bet, BetStatus
+from app.models.bet_entry import BetEntry
+from app.models.score_event import ScoreEvent
+from app.models.user_circle_stats import UserCircleStats
+
+
+@dataclass
+class _Stats:
+    circle_id: uuid.UUID
+    user_id: uuid.UUID
+    bets_won: int = 0
+    bets_lost: int = 0
+    current_streak: int = 0
+    best_win_streak: int = 0
+    double_downs: int = 0
+    double_downs_won: int = 0
+
+    def add(self, won: bool, doubled: bool) -> None:
+        """Same streak rules as the settlement upsert in app.services.bet._settle_scores."""
+        if won:
+            self.bets_won += 1
+            self.current_streak = self.current_streak + 1 if self.current_streak > 0 else 1
+            self.best_win_streak = max(self.best_win_streak, self.current_streak)
+        else:
+            self.bets_lost += 1
+            self.current_streak = self.current_streak - 1 if self.current_streak < 0 else -1
+        if doubled:
+            self.double_downs += 1
+            self.double_downs_won += won
+
+
+def _history():
+    settled_at = func.coalesce(ScoreEvent.created_at, Bet.end_time, Bet.created_at)
+    return (
+        select(
+            Bet.circle_id,
+            BetEntry.user_id,
+            BetEntry.option_id == Bet.result_option_id,
+            BetEntry.is_double_down,
+        )
+        .join(Bet, Bet.id == BetEntry.bet_id)
+        .outerjoin(ScoreEvent, and_(ScoreEvent.bet_id == BetEntry.bet_id, ScoreEvent.user_id == BetEntry.user_id))
+        .where(Bet.status == BetStatus.FINISHED, Bet.result_option_id.is_not(None))
+        .order_by(Bet.circle_id, BetEntry.user_id, settled_at, Bet.id)
+    )
+
+
+async def _write(rows: list[_Stats]) -> None:
+    if not rows:
+        return
+    stmt = pg_insert(UserCircleStats).values([vars(r) for r in rows])
+    async with async_session() as db:
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[UserCircleStats.circle_id, UserCircleStats.user_id],
+                set_={
+                    name: stmt.excluded[name]
+                    for name in (
+                        "bets_won",
+                        "bets_lost",
+                        "current_streak",
+                        "best_win_streak",
+                        "double_downs",
+                        "double_downs_won",
+                    )
+                }
+                | {"updated_at": func.now()},
+            )
+        )
+        await db.commit()
+
+
+async def main() -> None:
+    batch_size = int(os.environ.get("BATCH_SIZE", "1000"))
+    pending: list[_Stats] = []
+    current: _Stats | None = None
+    entries = written = 0
+
+    async with async_session() as reader:
+        result = await reader.stream(_history().execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            for circle_id, user_id, won, doubled in partition:
+                if current is None or (current.circle_id, current.user_id) != (circle_id, user_id):
+                    # Rows are grouped by member, so the previous member is complete
+                    if current is not None:
+                        pending.append(current)
+                    current = _Stats(circle_id, user_id)
+                current.add(won, doubled)
+                entries += 1
+            if len(pending) >= batch_size:
+                await _write(pending)
+                written += len(pending)
+                pending = []
+    if current is not None:
+        pending.append(current)
+    await _write(pending)
+    written += len(pending)
+    print(f"Folded {entries} settled entries into {written} user_circle_stats rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+"""
+Count the SQL statements behind the circle page, with and without cached membership facts.
+
+Seeds a throwaway circle with two members and a few pending bets, then replays the
+requests the circle page makes (circle, bet list, leaderboard, opening a bet, entering it
+and the refetches that follow) through the ASGI app. The flow runs once to warm the bet
+list and leaderboard caches, once with the membership caches cleared before every request
+(one membership query per check, as before the resolver) and once with them kept.
+Finally it compares opening the page with its five separate requests against one
+GET /circles/{id}/dashboard. Everything it creates is deleted at the end.
+
+Usage (from repo root, against a local Postgres):
+  uv run python scripts/bench_circle_page.py
+  # or: PYTHONPATH=. python3 scripts/bench_circle_page.py
+
+Requires DATABASE_URL (see app/config.py default for local Postgres).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from contextlib import contextmanager
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, event
+from sqlalchemy.engine import Engine
+
+from app.auth.jwt import create_access_token
+from app.database import async_session
+from app.main import app
+from app.models.bet import Bet, BetStatus
+from app.models.bet_option import BetOption
+from app.models.circle import Circle
+from app.models.circle_member import CircleMember
+from app.models.notification import Notification
+from app.models.notification_event import NotificationEvent
+from app.models.user import User
+from app.services.membership import member_cache, non_member_cache
+
+BETS = 5
+
+
+@contextmanager
+def _count_statements():
+    counter = {"n": 0}
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["n"] += 1
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+
+
+async def _seed() -> tuple[uuid.UUID, list[uuid.UUID], list[tuple[uuid.UUID, uuid.UUID]]]:
+    """Return (circle_id, user_ids, [(bet_id, first_option_id)])."""
+    tag = uuid.uuid4().hex[:8]
+    async with async_session() as db:
+        users = [User(email=f"page-{tag}-{i}@local.test", display_name=f"page-{tag}-{i}") for i in range(2)]
+        db.add_all(users)
+        await db.flush()
+        circle = Circle(name=f"page-{tag}", invite_token=uuid.uuid4().hex, creator_id=users[0].id, member_count=2)
+        db.add(circle)
+        await db.flush()
+        db.add_all([CircleMember(user_id=u.id, circle_id=circle.id, score=0) for u in users])
+        bets = [
+            Bet(
+                circle_id=circle.id,
+                creator_id=users[0].id,
+                title=f"page-{tag}-{i}",
+                status=BetStatus.PENDING,
+                options=[BetOption(label="Yes", position=0), BetOption(label="No", position=1)],
+            )
+            for i in range(BETS)
+        ]
+        db.add_all(bets)
+        circle.bet_count = BETS
+        await db.commit()
+        return circle.id, [u.id for u in users], [(b.id, b.options[0].id) for b in bets]
+
+
+async def _page_flow(
+    client: AsyncClient, circle_id: uuid.UUID, bet_id: uuid.UUID, option_id: uuid.UUID, clear: bool
+) -> list[tuple[str, int]]:
+    """Replay the circle page; returns [(request, statements)]."""
+    requests = [
+        ("GET", f"/circles/{circle_id}", None),
+        ("GET", f"/bets/circle/{circle_id}", None),
+        ("GET", f"/circles/{circle_id}/leaderboard?around_me=true", None),
+        ("GET", f"/bets/{bet_id}", None),
+        ("POST", f"/bets/{bet_id}/enter", {"option_id": str(option_id), "is_double_down": False}),
+        ("GET", f"/bets/{bet_id}", None),
+        ("GET", f"/bets/circle/{circle_id}", None),
+    ]
+    counts = []
+    for method, url, body in requests:
+        if clear:
+            member_cache.clear()
+            non_member_cache.clear()
+        with _count_statements() as counter:
+            resp = await client.request(method, url, json=body)
+        resp.raise_for_status()
+        path = url.split("?")[0].replace(str(circle_id), "{circle}").replace(str(bet_id), "{bet}")
+        counts.append((f"{method} {path}", counter["n"]))
+    return counts
+
+
+async def _open_page(client: AsyncClient, circle_id: uuid.UUID) -> tuple[int, int, int, int]:
+    """Return (separate requests, their statements, dashboard requests, its statements), caches warm."""
+    separate = [
+        f"/circles/{circle_id}",
+        f"/circles/{circle_id}/leaderboard?around_me=true",
+        f"/circles/{circle_id}/members",
+        f"/bets/circle/{circle_id}",
+        "/notifications/unread-count",
+    ]
+    with _count_statements() as counter:
+        for url in separate:
+            (await client.get(url)).raise_for_status()
+    separate_statements = counter["n"]
+    # Warm its own cache entries too (the dashboard asks for a shorter bet page)
+    (await client.get(f"/circles/{circle_id}/dashboard")).raise_for_status()
+    with _count_statements() as counter:
+        (await client.get(f"/circles/{circle_id}/dashboard")).raise_for_status()
+    return len(separate), separate_statements, 1, counter["n"]
+
+
+async def _cleanup(circle_id: uuid.UUID, user_ids: list[uuid.UUID]) -> None:
+    async with async_session() as db:
+        await db.execute(delete(NotificationEvent).where(NotificationEvent.circle_id == circle_id))
+        await db.execute(delete(Notification).where(Notification.circle_id == circle_id))
+        await db.execute(delete(Bet).where(Bet.circle_id == circle_id))
+        await db.execute(delete(CircleMember).where(CircleMember.circle_id == circle_id))
+        await db.execute(delete(Circle).where(Circle.id == circle_id))
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.commit()
+
+
+async def main() -> None:
+    circle_id, user_ids, bets = await _seed()
+    headers = {"Authorization": f"Bearer {create_access_token(user_ids[1])}"}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", headers=headers) as client:
+            await _page_flow(client, circle_id, *bets[0], clear=False)
+            uncached = await _page_flow(client, circle_id, *bets[1], clear=True)
+            cached = await _page_flow(client, circle_id, *bets[2], clear=False)
+            opening = await _open_page(client, circle_id)
+    finally:
+        await _cleanup(circle_id, user_ids)
+
+    print(f"  {'request':<36} {'uncached':>8} {'cached':>8}")
+    for (name, before), (_, after) in zip(uncached, cached, strict=True):
+        print(f"  {name:<36} {before:>8} {after:>8}")
+    total_before, total_after = sum(n for _, n in uncached), sum(n for _, n in cached)
+    print(f"  {'total':<36} {total_before:>8} {total_after:>8}  ({total_before - total_after} saved)")
+
+    requests, statements, dashboard_requests, dashboard_statements = opening
+    print(f"  opening the page: {requests} requests / {statements} statements separately, "
+          f"{dashboard_requests} request / {dashboard_statements} statements via the dashboard")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
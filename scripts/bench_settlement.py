@@ -0,0 +1,189 @@
+"""
+Benchmark end_bet settlement on a single bet with many participants.
+
+Creates a throwaway circle with N members who all enter one bet, then times
+app.services.bet.end_bet and counts the SQL statements it sends. For contrast it
+first replays the old per-entry settlement loop (one db.get per participant)
+inside a transaction that is rolled back. Everything it creates is deleted at the end.
+
+Usage (from repo root, against a local Postgres):
+  uv run python scripts/bench_settlement.py
+  # or: PYTHONPATH=. python3 scripts/bench_settlement.py
+
+Optional:
+  PARTICIPANTS=<n>   — number of participants (default: 10000)
+
+Requires DATABASE_URL (see app/config.py default for local Postgres).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import delete, event, insert, select, text, update
+from sqlalchemy.engine import Engine
+
+from app.database import async_session
+from app.models.bet import Bet, BetStatus
+from app.models.bet_entry import BetEntry
+from app.models.bet_option import BetOption
+from app.models.circle import Circle
+from app.models.circle_member import CircleMember
+from app.models.daily_score import DailyScore
+from app.models.notification import Notification
+from app.models.notification_event import NotificationEvent
+from app.models.score_event import ScoreEvent
+from app.models.user import User
+from app.models.user_circle_stats import UserCircleStats
+from app.schemas.bet import BetEndRequest
+from app.services.bet import end_bet
+
+BATCH = 1000
+
+
+@contextmanager
+def _count_statements():
+    counter = {"n": 0}
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter["n"] += 1
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+
+
+async def _seed(n: int) -> tuple[uuid.UUID, uuid.UUID, uuid.UUID, uuid.UUID, list[uuid.UUID]]:
+    """Return (circle_id, bet_id, creator_id, winning_option_id, user_ids)."""
+    tag = uuid.uuid4().hex[:8]
+    user_ids = [uuid.uuid4() for _ in range(n)]
+    circle_id, bet_id = uuid.uuid4(), uuid.uuid4()
+    opt_a, opt_b = uuid.uuid4(), uuid.uuid4()
+
+    async with async_session() as db:
+        for i in range(0, n, BATCH):
+            await db.execute(
+                insert(User),
+                [
+                    {
+                        "id": uid,
+                        "email": f"bench-{tag}-{i + j}@local.test",
+                        "display_name": f"bench-{tag}-{i + j}",
+                        "password_hash": None,
+                    }
+                    for j, uid in enumerate(user_ids[i : i + BATCH])
+                ],
+            )
+        await db.execute(
+            insert(Circle),
+            [{"id": circle_id, "name": f"bench-{tag}", "invite_token": uuid.uuid4().hex, "creator_id": user_ids[0]}],
+        )
+        for i in range(0, n, BATCH):
+            await db.execute(
+                insert(CircleMember),
+                [{"user_id": uid, "circle_id": circle_id, "score": 0} for uid in user_ids[i : i + BATCH]],
+            )
+        await db.execute(
+            insert(Bet),
+            [
+                {
+                    "id": bet_id,
+                    "circle_id": circle_id,
+                    "creator_id": user_ids[0],
+                    "title": f"bench-{tag}",
+                    "status": BetStatus.ACTIVE,
+                    "is_time_limited": False,
+                    "entries_count": n,
+                    "distinct_option_count": 2,
+                }
+            ],
+        )
+        await db.execute(
+            insert(BetOption),
+            [
+                {"id": opt_a, "bet_id": bet_id, "label": "A", "position": 0, "entry_count": (n + 1) // 2},
+                {"id": opt_b, "bet_id": bet_id, "label": "B", "position": 1, "entry_count": n // 2},
+            ],
+        )
+        for i in range(0, n, BATCH):
+            await db.execute(
+                insert(BetEntry),
+                [
+                    {
+                        "bet_id": bet_id,
+                        "user_id": uid,
+                        "option_id": opt_a if (i + j) % 2 == 0 else opt_b,
+                        "is_double_down": (i + j) % 5 == 0,
+                    }
+                    for j, uid in enumerate(user_ids[i : i + BATCH])
+                ],
+            )
+        await db.commit()
+    # Freshly loaded tables have no statistics yet; production ones do
+    async with async_session() as db:
+        for table in ("users", "circle_members", "bets", "bet_options", "bet_entries", "user_scores"):
+            await db.execute(text(f"ANALYZE {table}"))
+        await db.commit()
+    return circle_id, bet_id, user_ids[0], opt_a, user_ids
+
+
+async def _legacy_settle(circle_id: uuid.UUID, bet_id: uuid.UUID, win_id: uuid.UUID) -> None:
+    """The pre-set-based settlement loop, rolled back afterwards."""
+    async with async_session() as db:
+        entries = (await db.execute(select(BetEntry).where(BetEntry.bet_id == bet_id))).scalars().all()
+        for e in entries:
+            delta = 2 if e.is_double_down else 1
+            cm = await db.get(CircleMember, (e.user_id, circle_id))
+            if not cm:
+                continue
+            cm.score += delta if e.option_id == win_id else -delta
+        await db.flush()
+        await db.rollback()
+
+
+async def _cleanup(circle_id: uuid.UUID, bet_id: uuid.UUID, user_ids: list[uuid.UUID]) -> None:
+    async with async_session() as db:
+        await db.execute(delete(Notification).where(Notification.circle_id == circle_id))
+        await db.execute(delete(NotificationEvent).where(NotificationEvent.circle_id == circle_id))
+        await db.execute(delete(ScoreEvent).where(ScoreEvent.circle_id == circle_id))
+        await db.execute(delete(DailyScore).where(DailyScore.circle_id == circle_id))
+        await db.execute(delete(UserCircleStats).where(UserCircleStats.circle_id == circle_id))
+        await db.execute(update(Bet).where(Bet.id == bet_id).values(result_option_id=None))
+        await db.execute(delete(Bet).where(Bet.id == bet_id))
+        await db.execute(delete(CircleMember).where(CircleMember.circle_id == circle_id))
+        await db.execute(delete(Circle).where(Circle.id == circle_id))
+        for i in range(0, len(user_ids), BATCH):
+            await db.execute(delete(User).where(User.id.in_(user_ids[i : i + BATCH])))
+        await db.commit()
+
+
+async def main() -> None:
+    n = int(os.environ.get("PARTICIPANTS", "10000"))
+    print(f"Seeding a bet with {n} participants...")
+    circle_id, bet_id, creator_id, win_id, user_ids = await _seed(n)
+    try:
+        with _count_statements() as counter:
+            started = time.perf_counter()
+            await _legacy_settle(circle_id, bet_id, win_id)
+            legacy_elapsed = time.perf_counter() - started
+        print(f"  per-entry loop (rolled back): {legacy_elapsed:8.3f}s  {counter['n']:>6} statements")
+
+        async with async_session() as db:
+            creator = await db.get(User, creator_id)
+            with _count_statements() as counter:
+                started = time.perf_counter()
+                await end_bet(db, creator, bet_id, BetEndRequest(result_option_id=win_id))
+                elapsed = time.perf_counter() - started
+        print(f"  end_bet:                      {elapsed:8.3f}s  {counter['n']:>6} statements")
+    finally:
+        await _cleanup(circle_id, bet_id, user_ids)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -19,7 +19,7 @@ import os
 import sys
 import uuid
 
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import selectinload
 
 from app.auth.password import hash_password
@@ -73,6 +73,14 @@ def _reverse_finish_scores(
             cm.score += delta
 
 
+def _set_entry_counters(bet: Bet, opts: tuple[BetOption, ...], entries: list[BetEntry]) -> None:
+    """Mirror the denormalized counters app.services.bet.enter_bet maintains."""
+    for o in opts:
+        o.entry_count = sum(1 for e in entries if e.option_id == o.id)
+    bet.entries_count = len(entries)
+    bet.distinct_option_count = len({e.option_id for e in entries})
+
+
 async def _ensure_users_and_memberships(
     db, circle_id: uuid.UUID
 ) -> tuple[uuid.UUID, uuid.UUID]:
@@ -135,6 +143,18 @@ async def _remove_dev_seed_bets_and_reverse_scores(db) -> None:
     await db.flush()
 
 
+async def _sync_circle_counts(db, circle_id: uuid.UUID) -> None:
+    """Members and bets are inserted directly here, so recount the circle's stored counters."""
+    await db.execute(
+        update(Circle)
+        .where(Circle.id == circle_id)
+        .values(
+            member_count=select(func.count()).where(CircleMember.circle_id == circle_id).scalar_subquery(),
+            bet_count=select(func.count()).where(Bet.circle_id == circle_id).scalar_subquery(),
+        )
+    )
+
+
 async def _create_finished_bet(
     db,
     *,
@@ -182,6 +202,7 @@ async def _create_finished_bet(
             )
         )
     db.add_all(bet_entries)
+    _set_entry_counters(bet, opts, bet_entries)
     await db.flush()
 
     user_ids_in_bet = {e.user_id for e in bet_entries}
@@ -236,6 +257,7 @@ async def _create_open_bet(
             )
         )
     db.add_all(bet_entries)
+    _set_entry_counters(bet, opts, bet_entries)
     await db.flush()
 
 
@@ -350,6 +372,7 @@ async def main() -> None:
             ],
         )
 
+        await _sync_circle_counts(db, circle_id)
         await db.commit()
 
     print("Done.")
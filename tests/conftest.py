@@ -1,28 +1,40 @@
 import uuid
+from contextlib import contextmanager
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import settings
 from app.database import Base, get_db
 from app.main import app
 from app.models import *  # noqa: F401, F403
+from app.models.circle_member import CircleMember
+from app.models.user import User
 
 # Use a test database — replace only the database name at the end of the URL
 TEST_DATABASE_URL = settings.DATABASE_URL.rsplit("/", 1)[0] + "/circlebet_test"
 
 
 @pytest_asyncio.fixture
-async def client():
+async def session_factory():
     engine = create_async_engine(TEST_DATABASE_URL, echo=False)
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def client(session_factory):
     async def override_get_db():
         async with session_factory() as session:
             yield session
@@ -33,10 +45,6 @@ async def client():
         yield c
     app.dependency_overrides.clear()
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-    await engine.dispose()
-
 
 async def create_test_user(client: AsyncClient, email: str = None, display_name: str = "Test User") -> dict:
     """Helper to register a user and return {"user_id", "token", "email"}."""
@@ -57,5 +65,42 @@ async def create_test_user(client: AsyncClient, email: str = None, display_name:
     return {"user_id": user_data["id"], "token": token, "email": email}
 
 
+async def add_circle_members(
+    session_factory, circle_id: str, scores: list[int], display_name: str = "Member"
+) -> list[uuid.UUID]:
+    """Insert one user per score straight into the circle and return their ids in that order.
+
+    Much faster than create_test_user for large circles, which would hash a password per user.
+    Inserted in one transaction, so the members share joined_at.
+    """
+    async with session_factory() as db:
+        users = [
+            User(email=f"member-{uuid.uuid4().hex[:8]}@example.com", display_name=f"{display_name} {i}")
+            for i in range(len(scores))
+        ]
+        db.add_all(users)
+        await db.flush()
+        db.add_all(
+            [CircleMember(user_id=u.id, circle_id=uuid.UUID(circle_id), score=s) for u, s in zip(users, scores)]
+        )
+        await db.commit()
+        return [u.id for u in users]
+
+
 def auth_headers(token: str) -> dict:
     return {"Authorization": f"Bearer {token}"}
+
+
+@contextmanager
+def count_statements():
+    """Count SQL statements sent to the database inside the block."""
+    statements: list[str] = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
@@ -0,0 +1,656 @@
+import asyncio
+import random
+import uuid
+from collections import Counter
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import delete, func, select, text, update
+
+from app.auth.jwt import create_access_token
+from app.deadlines import DeadlineHeap, bet_deadlines
+from app.models.bet import Bet
+from app.models.bet_option import BetOption
+from app.models.circle_member import CircleMember
+from app.models.notification import Notification, NotificationType
+from app.models.notification_event import NotificationEvent
+from app.services.bet import bet_list_cache
+from app.services.membership import is_member, member_cache
+from app.tasks.expiry import run_expiry_worker, sweep_expired_bets
+from app.tasks.notifications import drain_outbox, prune_outbox
+from tests.conftest import add_circle_members, auth_headers, count_statements, create_test_user
+
+
+async def _circle_with_members(client: AsyncClient, n_members: int) -> tuple[dict, list[dict]]:
+    users = [
+        await create_test_user(client, display_name=f"Bettor {i}")
+        for i in range(n_members)
+    ]
+    resp = await client.post(
+        "/circles",
+        json={"name": "Bet Circle"},
+        headers=auth_headers(users[0]["token"]),
+    )
+    circle = resp.json()
+    for u in users[1:]:
+        await client.post(
+            f"/circles/join/{circle['invite_token']}",
+            headers=auth_headers(u["token"]),
+        )
+    return circle, users
+
+
+async def _create_bet(client: AsyncClient, circle_id: str, creator: dict, options: list[str]) -> dict:
+    resp = await client.post(
+        "/bets",
+        json={"circle_id": circle_id, "title": "Who wins?", "options": options},
+        headers=auth_headers(creator["token"]),
+    )
+    assert resp.status_code == 201
+    return resp.json()
+
+
+@pytest.mark.asyncio
+class TestBets:
+    async def test_list_circle_bets(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 2)
+        bet = await _create_bet(client, circle["id"], users[0], ["Yes", "No"])
+        await client.post(
+            f"/bets/{bet['id']}/enter",
+            json={"option_id": bet["options"][1]["id"]},
+            headers=auth_headers(users[1]["token"]),
+        )
+        await _create_bet(client, circle["id"], users[0], ["A", "B"])
+
+        resp = await client.get(f"/bets/circle/{circle['id']}", headers=auth_headers(users[1]["token"]))
+        assert resp.status_code == 200
+        bets = {b["id"]: b for b in resp.json()["items"]}
+        assert len(bets) == 2
+        assert bets[bet["id"]]["entries_count"] == 1
+        assert bets[bet["id"]]["my_entry"]["option_id"] == bet["options"][1]["id"]
+
+    async def test_list_circle_bets_cached_until_mutation(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 2)
+        bet = await _create_bet(client, circle["id"], users[0], ["Yes", "No"])
+        url = f"/bets/circle/{circle['id']}"
+
+        hits = bet_list_cache.hits
+        resp = await client.get(url, headers=auth_headers(users[0]["token"]))
+        assert resp.json()["items"][0]["my_entry"] is None
+        resp = await client.get(url, headers=auth_headers(users[1]["token"]))
+        assert bet_list_cache.hits == hits + 1
+        assert resp.json()["items"][0]["entries_count"] == 0
+
+        await client.post(
+            f"/bets/{bet['id']}/enter",
+            json={"option_id": bet["options"][0]["id"]},
+            headers=auth_headers(users[1]["token"]),
+        )
+        resp = await client.get(url, headers=auth_headers(users[1]["token"]))
+        assert bet_list_cache.hits == hits + 1
+        item = resp.json()["items"][0]
+        assert item["entries_count"] == 1
+        assert item["my_entry"]["option_id"] == bet["options"][0]["id"]
+
+        resp = await client.get(url, headers=auth_headers(users[0]["token"]))
+        assert bet_list_cache.hits == hits + 2
+        assert resp.json()["items"][0]["my_entry"] is None
+
+    async def test_list_circle_bets_paginates(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 1)
+        created = [(await _create_bet(client, circle["id"], users[0], ["Yes", "No"]))["id"] for _ in range(5)]
+
+        seen: list[str] = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            resp = await client.get(
+                f"/bets/circle/{circle['id']}", params=params, headers=auth_headers(users[0]["token"])
+            )
+            assert resp.status_code == 200
+            page = resp.json()
+            assert len(page["items"]) <= 2
+            seen.extend(b["id"] for b in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == list(reversed(created))
+
+    async def test_list_circle_bets_invalid_cursor(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 1)
+        resp = await client.get(
+            f"/bets/circle/{circle['id']}",
+            params={"cursor": "not-a-cursor"},
+            headers=auth_headers(users[0]["token"]),
+        )
+        assert resp.status_code == 400
+
+    async def test_get_bet_statement_count_independent_of_options(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 6)
+        viewer = users[0]
+
+        counts = []
+        for labels in (["Yes", "No"], ["A", "B", "C", "D", "E"]):
+            bet = await _create_bet(client, circle["id"], users[0], labels)
+            for i, u in enumerate(users[1:]):
+                option = bet["options"][i % len(labels)]
+                await client.post(
+                    f"/bets/{bet['id']}/enter",
+                    json={"option_id": option["id"]},
+                    headers=auth_headers(u["token"]),
+                )
+
+            with count_statements() as statements:
+                resp = await client.get(f"/bets/{bet['id']}", headers=auth_headers(viewer["token"]))
+            assert resp.status_code == 200
+            data = resp.json()
+            assert data["entries_count"] == 5
+            assert sum(data["option_counts"].values()) == 5
+            assert set(data["option_counts"]) == {o["id"] for o in bet["options"]}
+            counts.append(len(statements))
+
+        assert counts[0] == counts[1]
+
+    async def test_entry_counters_drive_activation(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 3)
+        bet = await _create_bet(client, circle["id"], users[0], ["Yes", "No"])
+        yes, no = bet["options"][0]["id"], bet["options"][1]["id"]
+
+        resp = await client.post(
+            f"/bets/{bet['id']}/enter", json={"option_id": yes}, headers=auth_headers(users[1]["token"])
+        )
+        assert resp.json()["status"] == "PENDING"
+        resp = await client.post(
+            f"/bets/{bet['id']}/enter", json={"option_id": yes}, headers=auth_headers(users[0]["token"])
+        )
+        assert resp.json()["status"] == "PENDING"
+        resp = await client.post(
+            f"/bets/{bet['id']}/enter", json={"option_id": no}, headers=auth_headers(users[2]["token"])
+        )
+        assert resp.json()["status"] == "ACTIVE"
+        assert resp.json()["entries_count"] == 3
+
+        resp = await client.get(f"/bets/{bet['id']}", headers=auth_headers(users[0]["token"]))
+        assert resp.json()["option_counts"] == {yes: 2, no: 1}
+
+    async def test_end_bet_settles_scores(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 3)
+        bet = await _create_bet(client, circle["id"], users[0], ["Yes", "No"])
+        yes, no = bet["options"][0]["id"], bet["options"][1]["id"]
+        picks = [(users[0], yes, False), (users[1], yes, True), (users[2], no, True)]
+        for u, option_id, doubled in picks:
+            await client.post(
+                f"/bets/{bet['id']}/enter",
+                json={"option_id": option_id, "is_double_down": doubled},
+                headers=auth_headers(u["token"]),
+            )
+
+        resp = await client.post(
+            f"/bets/{bet['id']}/end", json={"result_option_id": yes}, headers=auth_headers(users[0]["token"])
+        )
+        assert resp.status_code == 200
+        assert resp.json()["status"] == "FINISHED"
+
+        resp = await client.get(f"/circles/{circle['id']}/leaderboard", headers=auth_headers(users[0]["token"]))
+        scores = {e["user_id"]: e["score"] for e in resp.json()}
+        assert scores == {users[0]["user_id"]: 1, users[1]["user_id"]: 2, users[2]["user_id"]: -2}
+
+    async def test_create_bet_notifies_other_members(self, client: AsyncClient, session_factory):
+        circle, users = await _circle_with_members(client, 3)
+        bet = await _create_bet(client, circle["id"], users[0], ["Yes", "No"])
+
+        async with session_factory() as db:
+            assert await db.scalar(select(func.count()).select_from(NotificationEvent)) == 1
+            assert await db.scalar(select(func.count()).select_from(Notification)) == 0
+        assert await drain_outbox(session_factory) == 1
+        assert await drain_outbox(session_factory) == 0
+
+        resp = await client.get("/notifications", headers=auth_headers(users[0]["token"]))
+        assert resp.json() == []
+        for u in users[1:]:
+            resp = await client.get("/notifications", headers=auth_headers(u["token"]))
+            notifications = resp.json()
+            assert len(notifications) == 1
+            assert notifications[0]["type"] == "BET_CREATED"
+            assert notifications[0]["bet_id"] == bet["id"]
+            assert notifications[0]["is_read"] is False
+
+    async def test_prune_outbox_drops_only_old_processed_events(self, client: AsyncClient, session_factory):
+        circle, users = await _circle_with_members(client, 2)
+        for _ in range(3):
+            await _create_bet(client, circle["id"], users[0], ["Yes", "No"])
+        await drain_outbox(session_factory)
+        await _create_bet(client, circle["id"], users[0], ["Yes", "No"])
+
+        async with session_factory() as db:
+            processed = select(NotificationEvent.id).where(NotificationEvent.processed_at.is_not(None))
+            old = (await db.execute(processed)).scalars().all()
+            await db.execute(
+                update(NotificationEvent)
+                .where(NotificationEvent.id.in_(old[:2]))
+                .values(processed_at=datetime.now(timezone.utc) - timedelta(days=30))
+            )
+            await db.commit()
+
+        assert await prune_outbox(session_factory, batch_size=1) == 2
+        async with session_factory() as db:
+            remaining = (await db.execute(select(NotificationEvent.processed_at))).scalars().all()
+            assert sorted(p is None for p in remaining) == [False, True]
+            assert await db.scalar(select(func.count()).select_from(Notification)) == 3
+
+    async def test_mutations_do_not_reselect_bet(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 2)
+
+        with count_statements() as statements:
+            bet = await _create_bet(client, circle["id"], users[0], ["Yes", "No", "Maybe"])
+        assert not [s for s in statements if s.lstrip().startswith("SELECT") and "FROM bets" in s]
+        assert bet["entries_count"] == 0
+        assert [o["label"] for o in bet["options"]] == ["Yes", "No", "Maybe"]
+
+        with count_statements() as statements:
+            resp = await client.post(
+                f"/bets/{bet['id']}/enter",
+                json={"option_id": bet["options"][2]["id"]},
+                headers=auth_headers(users[1]["token"]),
+            )
+        assert len([s for s in statements if s.lstrip().startswith("SELECT") and "FROM bets" in s]) == 1
+        data = resp.json()
+        assert data["entries_count"] == 1
+        assert data["my_entry"]["option_id"] == bet["options"][2]["id"]
+
+    async def test_update_bet_replaces_options(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 1)
+        bet = await _create_bet(client, circle["id"], users[0], ["Yes", "No"])
+        await client.post(
+            f"/bets/{bet['id']}/enter",
+            json={"option_id": bet["options"][0]["id"]},
+            headers=auth_headers(users[0]["token"]),
+        )
+
+        resp = await client.patch(
+            f"/bets/{bet['id']}",
+            json={"options": ["Red", "Green", "Blue"], "creator_option_index": 2},
+            headers=auth_headers(users[0]["token"]),
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [o["label"] for o in data["options"]] == ["Red", "Green", "Blue"]
+        assert data["my_entry"]["option_id"] == data["options"][2]["id"]
+        assert data["entries_count"] == 1
+
+    async def test_update_bet_keeps_options_once_others_entered(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 2)
+        bet = await _create_bet(client, circle["id"], users[0], ["Yes", "No"])
+        await client.post(
+            f"/bets/{bet['id']}/enter",
+            json={"option_id": bet["options"][1]["id"]},
+            headers=auth_headers(users[1]["token"]),
+        )
+
+        resp = await client.patch(
+            f"/bets/{bet['id']}",
+            json={"title": "Renamed", "options": ["Red", "Green"]},
+            headers=auth_headers(users[0]["token"]),
+        )
+        assert resp.status_code == 409
+        resp = await client.get(f"/bets/{bet['id']}", headers=auth_headers(users[1]["token"]))
+        data = resp.json()
+        assert data["title"] == bet["title"]
+        assert [o["label"] for o in data["options"]] == ["Yes", "No"]
+        assert data["my_entry"]["option_id"] == bet["options"][1]["id"]
+
+        # Edits that leave the options alone are still allowed
+        resp = await client.patch(
+            f"/bets/{bet['id']}", json={"title": "Renamed"}, headers=auth_headers(users[0]["token"])
+        )
+        assert resp.status_code == 200
+
+    async def test_update_bet_notifies_only_on_deadline_change(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 1)
+        bet = await _create_bet(client, circle["id"], users[0], ["Yes", "No"])
+        headers = auth_headers(users[0]["token"])
+
+        with count_statements() as statements:
+            resp = await client.patch(f"/bets/{bet['id']}", json={"title": "Renamed"}, headers=headers)
+        assert resp.status_code == 200
+        assert not [s for s in statements if "pg_notify" in s]
+        assert not [s for s in statements if s.lstrip().startswith("UPDATE bets") and "end_time" in s]
+
+        end_time = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+        with count_statements() as statements:
+            resp = await client.patch(
+                f"/bets/{bet['id']}", json={"is_time_limited": True, "end_time": end_time}, headers=headers
+            )
+        assert resp.status_code == 200
+        assert len([s for s in statements if "pg_notify" in s]) == 1
+
+        with count_statements() as statements:
+            resp = await client.patch(
+                f"/bets/{bet['id']}", json={"title": "Again", "end_time": end_time}, headers=headers
+            )
+        assert resp.status_code == 200
+        assert not [s for s in statements if "pg_notify" in s]
+
+    async def test_bulk_create_fixed_statements_and_one_notification(self, client: AsyncClient, session_factory):
+        circle, users = await _circle_with_members(client, 2)
+
+        counts = []
+        for n in (2, 6):
+            payload = {
+                "circle_id": circle["id"],
+                "bets": [
+                    {"circle_id": circle["id"], "title": f"Match {i}", "options": ["Home", "Away", "Draw"]}
+                    for i in range(n)
+                ],
+            }
+            # Compare cold requests: the second would otherwise skip the cached membership check
+            member_cache.clear()
+            with count_statements() as statements:
+                resp = await client.post("/bets/bulk", json=payload, headers=auth_headers(users[0]["token"]))
+            assert resp.status_code == 201
+            created = resp.json()
+            assert [b["title"] for b in created] == [f"Match {i}" for i in range(n)]
+            assert all(len(b["options"]) == 3 for b in created)
+            counts.append(len(statements))
+        assert counts[0] == counts[1]
+
+        await drain_outbox(session_factory)
+        resp = await client.get("/notifications", headers=auth_headers(users[1]["token"]))
+        assert sorted(n["message"] for n in resp.json()) == ["2 new bets were created", "6 new bets were created"]
+
+    async def test_bulk_create_rejects_mixed_circles(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 1)
+        resp = await client.post(
+            "/bets/bulk",
+            json={
+                "circle_id": circle["id"],
+                "bets": [{"circle_id": users[0]["user_id"], "title": "X", "options": ["A", "B"]}],
+            },
+            headers=auth_headers(users[0]["token"]),
+        )
+        assert resp.status_code == 422
+
+    async def test_concurrent_entries_are_race_free(self, client: AsyncClient, session_factory):
+        circle, (creator,) = await _circle_with_members(client, 1)
+        bet = await _create_bet(client, circle["id"], creator, ["Yes", "No"])
+        yes, no = bet["options"][0]["id"], bet["options"][1]["id"]
+
+        racers = await add_circle_members(session_factory, circle["id"], [0] * 100, display_name="Racer")
+
+        # Every racer double-taps five times: 500 simultaneous requests
+        requests = [
+            client.post(
+                f"/bets/{bet['id']}/enter",
+                json={"option_id": yes if i % 2 else no},
+                headers=auth_headers(create_access_token(user_id)),
+            )
+            for i, user_id in enumerate(racers)
+            for _ in range(5)
+        ]
+        responses = await asyncio.gather(*requests)
+
+        codes = Counter(r.status_code for r in responses)
+        assert set(codes) <= {200, 400}
+        assert codes[200] == 100
+        assert all(r.json()["detail"] == "You have already entered this bet" for r in responses if r.status_code == 400)
+
+        resp = await client.get(f"/bets/{bet['id']}", headers=auth_headers(creator["token"]))
+        data = resp.json()
+        assert data["status"] == "ACTIVE"
+        assert data["entries_count"] == 100
+        assert data["option_counts"] == {yes: 50, no: 50}
+
+    async def test_entry_racing_option_replacement_conflicts(self, client: AsyncClient, session_factory):
+        circle, (creator, bettor) = await _circle_with_members(client, 2)
+        bet = await _create_bet(client, circle["id"], creator, ["Yes", "No"])
+        bet_id = uuid.UUID(bet["id"])
+
+        async with session_factory() as editor, session_factory() as observer:
+            # Lock the bet row the way update_bet's compare-and-swap does
+            await editor.execute(update(Bet).where(Bet.id == bet_id).values(version=Bet.version + 1))
+            entry = asyncio.create_task(
+                client.post(
+                    f"/bets/{bet['id']}/enter",
+                    json={"option_id": bet["options"][0]["id"]},
+                    headers=auth_headers(bettor["token"]),
+                )
+            )
+            # Wait until the entry has read the bet and is queued behind the lock
+            for _ in range(100):
+                if await observer.scalar(text("SELECT count(*) FROM pg_locks WHERE NOT granted")):
+                    break
+                await asyncio.sleep(0.05)
+            else:
+                pytest.fail("entry never waited on the bet row")
+            editor.add_all([BetOption(bet_id=bet_id, label=label, position=i) for i, label in enumerate("AB")])
+            await editor.flush()
+            await editor.execute(delete(BetOption).where(BetOption.id.in_([o["id"] for o in bet["options"]])))
+            await editor.commit()
+            resp = await entry
+
+        # Neither a deadlock nor a foreign-key failure, but a conflict the client can retry
+        assert resp.status_code == 409
+        resp = await client.get(f"/bets/{bet['id']}", headers=auth_headers(creator["token"]))
+        assert resp.json()["entries_count"] == 0
+
+    async def test_if_match_guards_edits_and_delete(self, client: AsyncClient):
+        circle, (creator,) = await _circle_with_members(client, 1)
+        headers = auth_headers(creator["token"])
+        resp = await client.post(
+            "/bets", json={"circle_id": circle["id"], "title": "Who wins?", "options": ["Yes", "No"]}, headers=headers
+        )
+        assert resp.headers["ETag"] == '"1"'
+        bet = resp.json()
+
+        resp = await client.get(f"/bets/{bet['id']}", headers=headers)
+        assert resp.headers["ETag"] == '"1"'
+
+        current = {**headers, "If-Match": '"1"'}
+        resp = await client.patch(f"/bets/{bet['id']}", json={"title": "Renamed"}, headers=current)
+        assert resp.status_code == 200
+        assert resp.json()["version"] == 2
+        assert resp.headers["ETag"] == '"2"'
+
+        stale = {**headers, "If-Match": '"1"'}
+        resp = await client.patch(f"/bets/{bet['id']}", json={"title": "Lost update"}, headers=stale)
+        assert resp.status_code == 409
+        resp = await client.patch(f"/bets/{bet['id']}/image", json={"image_url": "https://x/y.png"}, headers=stale)
+        assert resp.status_code == 409
+        resp = await client.delete(f"/bets/{bet['id']}", headers=stale)
+        assert resp.status_code == 409
+
+        resp = await client.get(f"/bets/{bet['id']}", headers=headers)
+        assert resp.json()["title"] == "Renamed"
+
+        resp = await client.patch(f"/bets/{bet['id']}", json={"title": "Any"}, headers={**headers, "If-Match": "*"})
+        assert resp.status_code == 200
+        resp = await client.delete(f"/bets/{bet['id']}", headers={**headers, "If-Match": "junk"})
+        assert resp.status_code == 400
+        resp = await client.delete(f"/bets/{bet['id']}", headers={**headers, "If-Match": '"3"'})
+        assert resp.status_code == 204
+
+    async def test_concurrent_end_bet_settles_once(self, client: AsyncClient):
+        circle, users = await _circle_with_members(client, 3)
+        bet = await _create_bet(client, circle["id"], users[0], ["Yes", "No"])
+        yes, no = bet["options"][0]["id"], bet["options"][1]["id"]
+        for u, option_id in [(users[0], yes), (users[1], yes), (users[2], no)]:
+            resp = await client.post(
+                f"/bets/{bet['id']}/enter", json={"option_id": option_id}, headers=auth_headers(u["token"])
+            )
+        # Activation is a state change, so it moves the version on
+        assert resp.json()["status"] == "ACTIVE"
+        assert resp.json()["version"] == 2
+
+        creator = auth_headers(users[0]["token"])
+        responses = await asyncio.gather(
+            client.post(f"/bets/{bet['id']}/end", json={"result_option_id": yes}, headers=creator),
+            client.post(f"/bets/{bet['id']}/end", json={"result_option_id": no}, headers=creator),
+        )
+        ok = [r for r in responses if r.status_code == 200]
+        assert len(ok) == 1
+        assert {r.status_code for r in responses if r.status_code != 200} <= {400, 409}
+
+        winner = ok[0].json()["result_option_id"]
+        resp = await client.get(f"/circles/{circle['id']}/leaderboard", headers=creator)
+        scores = {e["user_id"]: e["score"] for e in resp.json()}
+        if winner == yes:
+            assert scores == {users[0]["user_id"]: 1, users[1]["user_id"]: 1, users[2]["user_id"]: -1}
+        else:
+            assert scores == {users[0]["user_id"]: -1, users[1]["user_id"]: -1, users[2]["user_id"]: 1}
+
+    async def test_concurrent_settlements_in_one_circle(self, client: AsyncClient, session_factory):
+        circle, (creator,) = await _circle_with_members(client, 1)
+        # A large circle with few entrants per bet makes the planner drive the score UPDATE from
+        # bet_entries, visiting entrants in entry order rather than in circle_members heap order
+        crowd = await add_circle_members(session_factory, circle["id"], [0] * 2000, display_name="Settler")
+        members = crowd[:30]
+        async with session_factory() as db:
+            await db.execute(text("ANALYZE circle_members"))
+            await db.commit()
+        bets = [await _create_bet(client, circle["id"], creator, ["Yes", "No"]) for _ in range(12)]
+        # Everyone enters every bet, in a different order per bet; the creator takes the losing side
+        rng = random.Random(5)
+        entrants = [(auth_headers(create_access_token(user_id)), 0) for user_id in members]
+        entrants.append((auth_headers(creator["token"]), 1))
+        for bet in bets:
+            for headers, option in rng.sample(entrants, len(entrants)):
+                resp = await client.post(
+                    f"/bets/{bet['id']}/enter", json={"option_id": bet["options"][option]["id"]}, headers=headers
+                )
+                assert resp.status_code == 200
+
+        headers = auth_headers(creator["token"])
+        ends = [
+            client.post(f"/bets/{bet['id']}/end", json={"result_option_id": bet["options"][0]["id"]}, headers=headers)
+            for bet in bets
+        ]
+        responses = await asyncio.gather(*ends)
+        assert [r.status_code for r in responses] == [200] * len(bets)
+
+        async with session_factory() as db:
+            result = await db.execute(
+                select(CircleMember.user_id, CircleMember.score).where(
+                    CircleMember.circle_id == uuid.UUID(circle["id"]), CircleMember.score != 0
+                )
+            )
+            scores = dict(result.all())
+        assert scores == {**{user_id: len(bets) for user_id in members}, uuid.UUID(creator["user_id"]): -len(bets)}
+
+    async def test_expiry_sweep_closes_pending_bets_in_batches(self, client: AsyncClient, session_factory):
+        circle, (creator, other) = await _circle_with_members(client, 2)
+        headers = auth_headers(creator["token"])
+        soon = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+        bets = []
+        for _ in range(3):
+            resp = await client.post(
+                "/bets",
+                json={"circle_id": circle["id"], "title": "By noon?", "options": ["Yes", "No"],
+                      "is_time_limited": True, "end_time": soon},
+                headers=headers,
+            )
+            bets.append(resp.json())
+        pending_a, pending_b, active = bets
+        for u, option in [(creator, active["options"][0]), (other, active["options"][1])]:
+            await client.post(
+                f"/bets/{active['id']}/enter", json={"option_id": option["id"]}, headers=auth_headers(u["token"])
+            )
+
+        async with session_factory() as db:
+            await db.execute(
+                update(Bet).where(Bet.id.in_([uuid.UUID(b["id"]) for b in bets]))
+                .values(end_time=datetime.now(timezone.utc) - timedelta(seconds=1))
+            )
+            await db.commit()
+
+        assert await sweep_expired_bets(session_factory, batch_size=1) == 2
+        assert await sweep_expired_bets(session_factory, batch_size=1) == 0
+
+        for bet, expected in [(pending_a, "FINISHED"), (pending_b, "FINISHED"), (active, "ACTIVE")]:
+            resp = await client.get(f"/bets/{bet['id']}", headers=headers)
+            assert resp.json()["status"] == expected
+            assert resp.json()["result_option_id"] is None
+        resp = await client.get(f"/bets/{pending_a['id']}", headers=headers)
+        assert resp.json()["version"] == 2
+
+        async with session_factory() as db:
+            ended = await db.scalar(
+                select(func.count()).select_from(NotificationEvent)
+                .where(NotificationEvent.type == NotificationType.BET_ENDED)
+            )
+            assert ended == 2
+
+    async def test_deadline_heap_reschedule_and_cancel(self):
+        heap = DeadlineHeap()
+        now = datetime.now(timezone.utc)
+        a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        heap.schedule(a, now + timedelta(seconds=30))
+        heap.schedule(b, now + timedelta(seconds=10))
+        heap.schedule(c, now + timedelta(seconds=20))
+        heap.schedule(b, now + timedelta(seconds=40))
+        heap.schedule(c, None)
+        assert len(heap) == 2
+        assert heap.next_deadline() == now + timedelta(seconds=30)
+        assert heap.pop_due(now + timedelta(seconds=35)) == [a]
+        assert heap.pop_due(now + timedelta(seconds=60)) == [b]
+        assert heap.next_deadline() is None
+
+    async def test_expiry_worker_closes_bet_at_its_deadline(self, client: AsyncClient, session_factory):
+        circle, (creator,) = await _circle_with_members(client, 1)
+        headers = auth_headers(creator["token"])
+        bet_deadlines.clear()
+        worker = asyncio.create_task(run_expiry_worker(session_factory))
+        await asyncio.sleep(0.2)  # let the worker attach its listener
+        try:
+            deadline = datetime.now(timezone.utc) + timedelta(seconds=1)
+            resp = await client.post(
+                "/bets",
+                json={"circle_id": circle["id"], "title": "Now?", "options": ["Yes", "No"],
+                      "is_time_limited": True, "end_time": deadline.isoformat()},
+                headers=headers,
+            )
+            bet = resp.json()
+            # Published with NOTIFY on commit and picked up by the worker's listener
+            for _ in range(50):
+                if bet_deadlines.next_deadline() is not None:
+                    break
+                await asyncio.sleep(0.01)
+            assert bet_deadlines.next_deadline() == deadline
+
+            # Closed within a fraction of a second of end_time, long before the next reconciliation
+            await asyncio.sleep((deadline - datetime.now(timezone.utc)).total_seconds() + 0.5)
+            resp = await client.get(f"/bets/{bet['id']}", headers=headers)
+            assert resp.json()["status"] == "FINISHED"
+            assert len(bet_deadlines) == 0
+        finally:
+            worker.cancel()
+            with suppress(asyncio.CancelledError):
+                await worker
+
+    async def test_membership_cached_and_invalidated_on_join(self, client: AsyncClient, session_factory):
+        circle, users = await _circle_with_members(client, 1)
+        outsider = await create_test_user(client, display_name="Outsider")
+        url = f"/bets/circle/{circle['id']}"
+
+        resp = await client.get(url, headers=auth_headers(outsider["token"]))
+        assert resp.status_code == 403
+        # The refusal is cached, so repeating it does not touch circle_members
+        with count_statements() as statements:
+            resp = await client.get(url, headers=auth_headers(outsider["token"]))
+        assert resp.status_code == 403
+        assert not any("circle_members" in s for s in statements)
+
+        # Joining drops the cached refusal right away
+        await client.post(f"/circles/join/{circle['invite_token']}", headers=auth_headers(outsider["token"]))
+        resp = await client.get(url, headers=auth_headers(outsider["token"]))
+        assert resp.status_code == 200
+
+        # Within one session the fact is memoized even with the process caches cleared
+        member_cache.clear()
+        async with session_factory() as db:
+            with count_statements() as statements:
+                assert await is_member(db, uuid.UUID(users[0]["user_id"]), uuid.UUID(circle["id"]))
+                assert await is_member(db, uuid.UUID(users[0]["user_id"]), uuid.UUID(circle["id"]))
+        assert len(statements) == 1
@@ -1,7 +1,10 @@
+import asyncio
+import json
+
 import pytest
 from httpx import AsyncClient
 
-from tests.conftest import auth_headers, create_test_user
+from tests.conftest import add_circle_members, auth_headers, count_statements, create_test_user
 
 
 @pytest.mark.asyncio
@@ -74,3 +77,113 @@ class TestCircles:
             headers=auth_headers(user["token"]),
         )
         assert resp.status_code == 404
+
+    async def test_counts_follow_joins_and_bets(self, client: AsyncClient):
+        creator = await create_test_user(client, email="counts1@test.com", display_name="Counts 1")
+        joiner = await create_test_user(client, email="counts2@test.com", display_name="Counts 2")
+        resp = await client.post("/circles", json={"name": "Counted"}, headers=auth_headers(creator["token"]))
+        circle = resp.json()
+        assert (circle["member_count"], circle["bet_count"]) == (1, 0)
+
+        bet = {"circle_id": circle["id"], "title": "Counted?", "options": ["Yes", "No"]}
+        resp = await client.post(
+            "/bets/bulk", json={"circle_id": circle["id"], "bets": [bet, bet]}, headers=auth_headers(creator["token"])
+        )
+        assert resp.status_code == 201
+        resp = await client.post(f"/circles/join/{circle['invite_token']}", headers=auth_headers(joiner["token"]))
+        assert (resp.json()["member_count"], resp.json()["bet_count"]) == (2, 2)
+
+        resp = await client.post("/bets", json=bet, headers=auth_headers(joiner["token"]))
+        resp = await client.delete(f"/bets/{resp.json()['id']}", headers=auth_headers(joiner["token"]))
+        assert resp.status_code == 204
+        resp = await client.post("/bets", json=bet, headers=auth_headers(joiner["token"]))
+
+        resp = await client.get("/circles", headers=auth_headers(joiner["token"]))
+        assert [(c["member_count"], c["bet_count"]) for c in resp.json()] == [(2, 3)]
+        resp = await client.get(f"/circles/{circle['id']}", headers=auth_headers(creator["token"]))
+        assert (resp.json()["member_count"], resp.json()["bet_count"]) == (2, 3)
+
+    async def test_members_keyset_pages_and_ndjson_stream(self, client: AsyncClient, session_factory):
+        owner = await create_test_user(client, email="members@test.com", display_name="Members Owner")
+        resp = await client.post("/circles", json={"name": "Crowd"}, headers=auth_headers(owner["token"]))
+        circle = resp.json()
+        # Inserted in one transaction, so they share joined_at and user_id decides their order
+        users = await add_circle_members(session_factory, circle["id"], [0] * 5, display_name="Crowd")
+        headers = auth_headers(owner["token"])
+        url = f"/circles/{circle['id']}/members"
+
+        seen, cursor = [], None
+        while True:
+            resp = await client.get(url, params={"limit": 2, **({"cursor": cursor} if cursor else {})}, headers=headers)
+            assert resp.status_code == 200
+            page = resp.json()
+            assert len(page["items"]) <= 2
+            seen += [m["user_id"] for m in page["items"]]
+            if not (cursor := page["next_cursor"]):
+                break
+        assert seen[0] == owner["user_id"]
+        assert seen[1:] == sorted(str(user_id) for user_id in users)
+
+        resp = await client.get(url, params={"format": "ndjson"}, headers=headers)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        streamed = [json.loads(line) for line in resp.text.splitlines()]
+        assert [m["user_id"] for m in streamed] == seen
+        assert set(streamed[0]) == {"user_id", "display_name", "score", "joined_at"}
+
+        resp = await client.get(url, params={"format": "ndjson", "cursor": "not-a-cursor"}, headers=headers)
+        assert resp.status_code == 400
+
+    async def test_join_burst_and_cached_invites(self, client: AsyncClient):
+        owner = await create_test_user(client, email="burst@test.com", display_name="Burst Owner")
+        resp = await client.post("/circles", json={"name": "Burst"}, headers=auth_headers(owner["token"]))
+        circle = resp.json()
+        joiners = [await create_test_user(client, display_name=f"Burst {i}") for i in range(20)]
+        url = f"/circles/join/{circle['invite_token']}"
+
+        responses = await asyncio.gather(*(client.post(url, headers=auth_headers(j["token"])) for j in joiners))
+        assert [r.status_code for r in responses] == [200] * 20
+        # Every join saw its own increment, so the counts in the responses are exactly 2..21
+        assert sorted(r.json()["member_count"] for r in responses) == list(range(2, 22))
+        resp = await client.get(f"/circles/{circle['id']}", headers=auth_headers(owner["token"]))
+        assert resp.json()["member_count"] == 21
+
+        # Joining again, even concurrently, is refused without touching the count
+        again = auth_headers(joiners[0]["token"])
+        responses = await asyncio.gather(*(client.post(url, headers=again) for _ in range(3)))
+        assert [r.status_code for r in responses] == [400] * 3
+        resp = await client.get(f"/circles/{circle['id']}", headers=auth_headers(owner["token"]))
+        assert resp.json()["member_count"] == 21
+
+        # An unknown token is remembered, so repeating it does not query circles
+        resp = await client.post("/circles/join/no-such-token", headers=auth_headers(owner["token"]))
+        assert resp.status_code == 404
+        with count_statements() as statements:
+            resp = await client.post("/circles/join/no-such-token", headers=auth_headers(owner["token"]))
+        assert resp.status_code == 404
+        assert not any("circles" in s for s in statements)
+
+    async def test_dashboard_bounded_previews(self, client: AsyncClient, session_factory):
+        owner = await create_test_user(client, email="dash@test.com", display_name="Dash Owner")
+        outsider = await create_test_user(client, email="dash-out@test.com", display_name="Dash Outsider")
+        resp = await client.post("/circles", json={"name": "Dash"}, headers=auth_headers(owner["token"]))
+        circle = resp.json()
+        await add_circle_members(session_factory, circle["id"], list(range(12)), display_name="Dash")
+        bet = {"circle_id": circle["id"], "title": "Dash?", "options": ["Yes", "No"]}
+        await client.post(
+            "/bets/bulk", json={"circle_id": circle["id"], "bets": [bet] * 12}, headers=auth_headers(owner["token"])
+        )
+
+        resp = await client.get(f"/circles/{circle['id']}/dashboard", headers=auth_headers(owner["token"]))
+        assert resp.status_code == 200
+        dashboard = resp.json()
+        assert dashboard["circle"]["bet_count"] == 12
+        assert len(dashboard["members"]["items"]) == 10 and dashboard["members"]["next_cursor"]
+        assert len(dashboard["bets"]["items"]) == 10 and dashboard["bets"]["next_cursor"]
+        # Top of the standings plus the caller's own position
+        assert dashboard["leaderboard"][0]["score"] == 11
+        assert owner["user_id"] in [e["user_id"] for e in dashboard["leaderboard"]]
+        assert dashboard["unread_count"] == 0
+
+        resp = await client.get(f"/circles/{circle['id']}/dashboard", headers=auth_headers(outsider["token"]))
+        assert resp.status_code == 403
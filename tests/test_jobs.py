@@ -0,0 +1,57 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from tests.conftest import TEST_DATABASE_URL
+
+# Competes for one named job and reports when it becomes the owner
+CHILD = """
+import asyncio, os, sys
+from app.tasks.runner import JobRunner
+
+async def job():
+    print("leading", os.getpid(), flush=True)
+    await asyncio.Event().wait()
+
+runner = JobRunner(sys.argv[1], retry_seconds=0.2, heartbeat_seconds=0.5)
+runner.add("test-job", job)
+asyncio.run(runner.run())
+"""
+
+
+async def _spawn() -> asyncio.subprocess.Process:
+    root = Path(__file__).resolve().parent.parent
+    return await asyncio.create_subprocess_exec(
+        sys.executable, "-c", CHILD, TEST_DATABASE_URL,
+        stdout=asyncio.subprocess.PIPE,
+        cwd=root,
+        env={**os.environ, "PYTHONPATH": str(root)},
+    )
+
+
+@pytest.mark.asyncio
+class TestJobRunner:
+    async def test_single_owner_with_failover(self):
+        first = await _spawn()
+        second = None
+        try:
+            line = await asyncio.wait_for(first.stdout.readline(), 15)
+            assert line.split() == [b"leading", str(first.pid).encode()]
+
+            second = await _spawn()
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(second.stdout.readline(), 2)
+
+            # The owner dies without releasing anything; Postgres drops its lock with the connection
+            first.kill()
+            await first.wait()
+            line = await asyncio.wait_for(second.stdout.readline(), 15)
+            assert line.split() == [b"leading", str(second.pid).encode()]
+        finally:
+            for proc in (first, second):
+                if proc and proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
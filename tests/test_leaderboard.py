@@ -1,7 +1,27 @@
+import uuid
+from datetime import date, timedelta
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select, update
+
+from app.auth.jwt import create_access_token
+from app.models.circle_member import CircleMember
+from app.models.daily_score import DailyScore
+from app.models.score_event import ScoreEvent
+from app.models.user_score import UserScore
+from app.services import leaderboard
+from app.services.leaderboard import invalidate_leaderboards, leaderboard_cache
+from app.tasks.leaderboard import reconcile_user_scores
+from tests.conftest import add_circle_members, auth_headers, create_test_user
 
-from tests.conftest import auth_headers, create_test_user
+
+async def _ranked_circle(client: AsyncClient, session_factory, scores: list[int]) -> tuple[str, list[uuid.UUID]]:
+    """A circle with its creator (score 0) plus one member per score, inserted directly."""
+    owner = await create_test_user(client, display_name="Owner")
+    resp = await client.post("/circles", json={"name": "Ranked"}, headers=auth_headers(owner["token"]))
+    circle_id = resp.json()["id"]
+    return circle_id, await add_circle_members(session_factory, circle_id, scores, display_name="Rank")
 
 
 @pytest.mark.asyncio
@@ -32,7 +52,291 @@ class TestLeaderboard:
         assert resp.status_code == 200
         entries = resp.json()
         assert len(entries) == 2
-        assert entries[0]["rank"] == 1
-        assert entries[1]["rank"] == 2
-        # Both should have same score initially
+        # Both have the same score initially, so they share first place
+        assert entries[0]["rank"] == entries[1]["rank"] == 1
         assert entries[0]["score"] == entries[1]["score"] == 0
+
+    async def test_leaderboard_pages_with_shared_ranks(self, client: AsyncClient, session_factory):
+        # Owner has 0, so standings are 9, 7, 7, 5, 3, 0, -1
+        circle_id, user_ids = await _ranked_circle(client, session_factory, [5, 7, 9, 7, -1, 3])
+        headers = auth_headers(create_access_token(user_ids[0]))
+        resp = await client.get(f"/circles/{circle_id}/leaderboard", headers=headers)
+        assert [(e["rank"], e["score"]) for e in resp.json()] == [
+            (1, 9), (2, 7), (2, 7), (4, 5), (5, 3), (6, 0), (7, -1)
+        ]
+
+        pages = []
+        for offset in (0, 3, 6):
+            resp = await client.get(f"/circles/{circle_id}/leaderboard?limit=3&offset={offset}", headers=headers)
+            pages.append([(e["rank"], e["score"]) for e in resp.json()])
+        assert pages == [[(1, 9), (2, 7), (2, 7)], [(4, 5), (5, 3), (6, 0)], [(7, -1)]]
+
+    async def test_leaderboard_around_me(self, client: AsyncClient, session_factory):
+        scores = list(range(100, 0, -1))
+        circle_id, user_ids = await _ranked_circle(client, session_factory, scores)
+        me = user_ids[49]  # score 51, rank 50
+
+        resp = await client.get(
+            f"/circles/{circle_id}/leaderboard?limit=3&around_me=true&radius=2",
+            headers=auth_headers(create_access_token(me)),
+        )
+        entries = resp.json()
+        assert [e["rank"] for e in entries] == [1, 2, 3, 48, 49, 50, 51, 52]
+        assert entries[5]["user_id"] == str(me)
+
+        # Near the top the two parts overlap instead of repeating rows
+        resp = await client.get(
+            f"/circles/{circle_id}/leaderboard?limit=3&around_me=true&radius=2",
+            headers=auth_headers(create_access_token(user_ids[1])),
+        )
+        assert [e["rank"] for e in resp.json()] == [1, 2, 3, 4]
+
+        # Only the requested rows are fetched and cached, in one entry for the circle; the second
+        # caller reused the shared page
+        slices = leaderboard_cache.peek((uuid.UUID(circle_id), "all"))
+        assert sorted(len(rows) for _, rows in slices.values()) == [3, 4, 5]
+
+    async def test_leaderboard_read_racing_invalidation_is_not_cached(
+        self, client: AsyncClient, session_factory, monkeypatch
+    ):
+        circle_id, user_ids = await _ranked_circle(client, session_factory, [5, 3])
+        circle_uuid = uuid.UUID(circle_id)
+        load_ranked = leaderboard._load_ranked
+
+        async def load_then_settle(*args, **kwargs):
+            rows = await load_ranked(*args, **kwargs)
+            # A settlement commits and invalidates after the read loaded its rows
+            invalidate_leaderboards(circle_uuid)
+            return rows
+
+        monkeypatch.setattr(leaderboard, "_load_ranked", load_then_settle)
+        async with session_factory() as db:
+            entries = await leaderboard.get_circle_leaderboard(db, circle_uuid, around_user_id=user_ids[0])
+        assert [e.score for e in entries] == [5, 3, 0]
+        assert leaderboard_cache.peek((circle_uuid, "all")) is None
+
+        monkeypatch.setattr(leaderboard, "_load_ranked", load_ranked)
+        async with session_factory() as db:
+            await leaderboard.get_circle_leaderboard(db, circle_uuid, around_user_id=user_ids[0])
+        assert len(leaderboard_cache.peek((circle_uuid, "all"))) == 2
+
+    async def test_leaderboard_cached_until_settlement_or_join(self, client: AsyncClient):
+        user1 = await create_test_user(client, email="lbc1@test.com", display_name="Cache 1")
+        user2 = await create_test_user(client, email="lbc2@test.com", display_name="Cache 2")
+        user3 = await create_test_user(client, email="lbc3@test.com", display_name="Cache 3")
+        resp = await client.post("/circles", json={"name": "Cached"}, headers=auth_headers(user1["token"]))
+        circle = resp.json()
+        await client.post(f"/circles/join/{circle['invite_token']}", headers=auth_headers(user2["token"]))
+        url = f"/circles/{circle['id']}/leaderboard"
+
+        await client.get(url, headers=auth_headers(user1["token"]))
+        hits = leaderboard_cache.hits
+        resp = await client.get(f"{url}?around_me=true", headers=auth_headers(user2["token"]))
+        assert leaderboard_cache.hits == hits + 1
+        assert len(resp.json()) == 2
+
+        # Joining invalidates
+        await client.post(f"/circles/join/{circle['invite_token']}", headers=auth_headers(user3["token"]))
+        resp = await client.get(url, headers=auth_headers(user1["token"]))
+        assert leaderboard_cache.hits == hits + 1
+        assert len(resp.json()) == 3
+
+        # Settling a bet invalidates
+        resp = await client.post(
+            "/bets",
+            json={"circle_id": circle["id"], "title": "Cache?", "options": ["Yes", "No"]},
+            headers=auth_headers(user1["token"]),
+        )
+        bet = resp.json()
+        yes, no = bet["options"][0]["id"], bet["options"][1]["id"]
+        for u, option_id in [(user1, yes), (user2, no)]:
+            await client.post(
+                f"/bets/{bet['id']}/enter", json={"option_id": option_id}, headers=auth_headers(u["token"])
+            )
+        await client.post(
+            f"/bets/{bet['id']}/end", json={"result_option_id": yes}, headers=auth_headers(user1["token"])
+        )
+        resp = await client.get(url, headers=auth_headers(user1["token"]))
+        assert leaderboard_cache.hits == hits + 1
+        assert [(e["user_id"], e["score"]) for e in resp.json()][0] == (user1["user_id"], 1)
+        assert resp.json()[-1]["score"] == -1
+
+    async def test_settlement_writes_ledger_and_windowed_leaderboards(self, client: AsyncClient, session_factory):
+        users = [
+            await create_test_user(client, email=f"win{i}@test.com", display_name=f"Window {i}") for i in range(3)
+        ]
+        resp = await client.post("/circles", json={"name": "Windows"}, headers=auth_headers(users[0]["token"]))
+        circle = resp.json()
+        for u in users[1:]:
+            await client.post(f"/circles/join/{circle['invite_token']}", headers=auth_headers(u["token"]))
+
+        for _ in range(2):
+            resp = await client.post(
+                "/bets",
+                json={"circle_id": circle["id"], "title": "Window?", "options": ["Yes", "No"]},
+                headers=auth_headers(users[0]["token"]),
+            )
+            bet = resp.json()
+            yes, no = bet["options"][0]["id"], bet["options"][1]["id"]
+            for u, option_id, doubled in [(users[0], yes, False), (users[1], yes, True), (users[2], no, False)]:
+                await client.post(
+                    f"/bets/{bet['id']}/enter",
+                    json={"option_id": option_id, "is_double_down": doubled},
+                    headers=auth_headers(u["token"]),
+                )
+            await client.post(
+                f"/bets/{bet['id']}/end", json={"result_option_id": yes}, headers=auth_headers(users[0]["token"])
+            )
+
+        circle_id = uuid.UUID(circle["id"])
+        async with session_factory() as db:
+            events = (await db.execute(select(ScoreEvent.user_id, ScoreEvent.delta))).all()
+            assert len(events) == 6
+            rollups = (await db.execute(select(DailyScore.user_id, DailyScore.delta))).all()
+            # Both bets settled today, so each member has one upserted rollup row
+            assert sorted(d for _, d in rollups) == [-2, 2, 4]
+            # History from last year counts all-time (seeded into score too) but in no window
+            old_timer = uuid.UUID(users[2]["user_id"])
+            db.add(DailyScore(circle_id=circle_id, day=date.today() - timedelta(days=400), user_id=old_timer, delta=10))
+            await db.execute(
+                update(CircleMember)
+                .where(CircleMember.circle_id == circle_id, CircleMember.user_id == old_timer)
+                .values(score=CircleMember.score + 10)
+            )
+            await db.commit()
+        invalidate_leaderboards(circle_id)
+
+        url = f"/circles/{circle['id']}/leaderboard"
+        headers = auth_headers(users[0]["token"])
+        resp = await client.get(url, headers=headers)
+        assert [e["score"] for e in resp.json()] == [8, 4, 2]
+        for window in ("week", "month", "season"):
+            resp = await client.get(f"{url}?window={window}", headers=headers)
+            assert [(e["user_id"], e["score"]) for e in resp.json()] == [
+                (users[1]["user_id"], 4), (users[0]["user_id"], 2), (users[2]["user_id"], -2)
+            ]
+
+    async def test_global_leaderboard_and_drift_repair(self, client: AsyncClient, session_factory):
+        users = [
+            await create_test_user(client, email=f"glob{i}@test.com", display_name=f"Global {i}") for i in range(3)
+        ]
+        # users[0] and users[1] share two circles; users[2] is only in the second
+        circles = []
+        for name, members in [("First", users[:2]), ("Second", users)]:
+            resp = await client.post("/circles", json={"name": name}, headers=auth_headers(members[0]["token"]))
+            circle = resp.json()
+            for u in members[1:]:
+                await client.post(f"/circles/join/{circle['invite_token']}", headers=auth_headers(u["token"]))
+            circles.append(circle)
+
+        for circle, picks in [
+            (circles[0], [(users[0], 0), (users[1], 1)]),
+            (circles[1], [(users[0], 0), (users[1], 1), (users[2], 0)]),
+        ]:
+            resp = await client.post(
+                "/bets",
+                json={"circle_id": circle["id"], "title": "Global?", "options": ["Yes", "No"]},
+                headers=auth_headers(users[0]["token"]),
+            )
+            bet = resp.json()
+            for u, idx in picks:
+                await client.post(
+                    f"/bets/{bet['id']}/enter",
+                    json={"option_id": bet["options"][idx]["id"]},
+                    headers=auth_headers(u["token"]),
+                )
+            await client.post(
+                f"/bets/{bet['id']}/end",
+                json={"result_option_id": bet["options"][0]["id"]},
+                headers=auth_headers(users[0]["token"]),
+            )
+
+        expected = [
+            (1, users[0]["user_id"], 2, 2, 2, 0),
+            (2, users[2]["user_id"], 1, 1, 1, 0),
+            (3, users[1]["user_id"], -2, 2, 0, 2),
+        ]
+
+        def rows(entries):
+            return [
+                (e["rank"], e["user_id"], e["total_score"], e["circles_count"], e["bets_won"], e["bets_lost"])
+                for e in entries
+            ]
+
+        resp = await client.get("/leaderboard/global", headers=auth_headers(users[1]["token"]))
+        assert rows(resp.json()) == expected
+        resp = await client.get("/leaderboard/global?limit=1&offset=1", headers=auth_headers(users[1]["token"]))
+        assert rows(resp.json()) == expected[1:2]
+
+        assert await reconcile_user_scores(session_factory) == 0
+        async with session_factory() as db:
+            await db.execute(
+                update(UserScore).where(UserScore.user_id == uuid.UUID(users[2]["user_id"])).values(total_score=99)
+            )
+            await db.commit()
+        assert await reconcile_user_scores(session_factory) == 1
+        resp = await client.get("/leaderboard/global", headers=auth_headers(users[1]["token"]))
+        assert rows(resp.json()) == expected
+
+    async def test_member_stats_follow_settlements(self, client: AsyncClient):
+        users = [
+            await create_test_user(client, email=f"stats{i}@test.com", display_name=f"Stats {i}") for i in range(3)
+        ]
+        resp = await client.post("/circles", json={"name": "Stats"}, headers=auth_headers(users[0]["token"]))
+        circle = resp.json()
+        for u in users[1:]:
+            await client.post(f"/circles/join/{circle['invite_token']}", headers=auth_headers(u["token"]))
+
+        # users[1] wins, wins, loses (doubling down on the first two); users[2] the reverse
+        for winner, doubled in [(0, True), (0, True), (1, False)]:
+            resp = await client.post(
+                "/bets",
+                json={"circle_id": circle["id"], "title": "Streak?", "options": ["Yes", "No"]},
+                headers=auth_headers(users[0]["token"]),
+            )
+            bet = resp.json()
+            options = [o["id"] for o in bet["options"]]
+            for u, option_id, dd in [(users[1], options[0], doubled), (users[2], options[1], False)]:
+                await client.post(
+                    f"/bets/{bet['id']}/enter",
+                    json={"option_id": option_id, "is_double_down": dd},
+                    headers=auth_headers(u["token"]),
+                )
+            await client.post(
+                f"/bets/{bet['id']}/end",
+                json={"result_option_id": options[winner]},
+                headers=auth_headers(users[0]["token"]),
+            )
+
+        headers = auth_headers(users[0]["token"])
+        url = f"/circles/{circle['id']}/members/{{}}/stats"
+        resp = await client.get(url.format(users[1]["user_id"]), headers=headers)
+        assert resp.status_code == 200
+        stats = resp.json()
+        assert (stats["bets_won"], stats["bets_lost"], stats["current_streak"], stats["best_win_streak"]) == (
+            2, 1, -1, 2
+        )
+        assert stats["win_rate"] == pytest.approx(2 / 3)
+        assert (stats["double_downs"], stats["double_downs_won"], stats["double_down_success_rate"]) == (2, 2, 1.0)
+
+        stats = (await client.get(url.format(users[2]["user_id"]), headers=headers)).json()
+        assert (stats["bets_won"], stats["bets_lost"], stats["current_streak"], stats["best_win_streak"]) == (
+            1, 2, 1, 1
+        )
+        assert stats["double_down_success_rate"] is None
+
+        # The creator entered nothing, so has no stats row
+        stats = (await client.get(url.format(users[0]["user_id"]), headers=headers)).json()
+        assert (stats["bets_won"], stats["bets_lost"], stats["win_rate"]) == (0, 0, None)
+
+    async def test_member_stats_hidden_from_non_members(self, client: AsyncClient):
+        member = await create_test_user(client, email="statsm@test.com", display_name="Stats M")
+        outsider = await create_test_user(client, email="statso@test.com", display_name="Stats O")
+        resp = await client.post("/circles", json={"name": "Private"}, headers=auth_headers(member["token"]))
+        url = f"/circles/{resp.json()['id']}/members/{{}}/stats"
+
+        resp = await client.get(url.format(member["user_id"]), headers=auth_headers(outsider["token"]))
+        assert resp.status_code == 403
+
+        resp = await client.get(url.format(outsider["user_id"]), headers=auth_headers(member["token"]))
+        assert resp.status_code == 404